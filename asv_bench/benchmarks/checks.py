@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Every check in ``engarde.checks`` across frame sizes, dtypes and failure
+rates. A failure rate of 0 times the passing path; otherwise that
+fraction of the rows is broken and the time includes building the
+error report.
+"""
+import numpy as np
+import pandas as pd
+
+import engarde.checks as ck
+
+from .common import (N_ROWS, N_COLS, DTYPES, FAIL_RATES, allowed, bounds,
+                     check_size, make_frame, run, skip)
+
+
+class _Check(object):
+    params = [N_ROWS, N_COLS, DTYPES, FAIL_RATES]
+    param_names = ['n_rows', 'n_cols', 'dtype', 'fail_rate']
+    fail = 'value'
+    layout = 'random'
+    timeout = 600
+
+    def setup(self, n_rows, n_cols, dtype, fail_rate):
+        self.df = make_frame(n_rows, n_cols, dtype, fail_rate, self.fail,
+                             self.layout)
+
+
+class NoneMissing(_Check):
+    fail = 'missing'
+
+    def time_none_missing(self, *args):
+        run(ck.none_missing, self.df)
+
+
+class IsMonotonic(_Check):
+    layout = 'sorted'
+
+    def time_is_monotonic(self, *args):
+        run(ck.is_monotonic, self.df, increasing=True)
+
+    def time_is_monotonic_strict(self, *args):
+        run(ck.is_monotonic, self.df, increasing=True, strict=True)
+
+    def time_is_monotonic_either(self, *args):
+        run(ck.is_monotonic, self.df)
+
+
+class IsShape(_Check):
+    params = [N_ROWS, N_COLS, DTYPES]
+    param_names = ['n_rows', 'n_cols', 'dtype']
+
+    def setup(self, n_rows, n_cols, dtype):
+        self.df = make_frame(n_rows, n_cols, dtype)
+
+    def time_is_shape(self, n_rows, n_cols, dtype):
+        ck.is_shape(self.df, (n_rows, -1))
+
+
+class Unique(_Check):
+    layout = 'unique'
+
+    def time_unique(self, *args):
+        run(ck.unique, self.df)
+
+
+class UniqueIndex(_Check):
+    layout = 'unique'
+
+    def setup(self, n_rows, n_cols, dtype, fail_rate):
+        if n_cols > 1:
+            skip('only the index is checked')
+        super(UniqueIndex, self).setup(n_rows, n_cols, dtype, fail_rate)
+        self.df = self.df.set_index('c0')
+
+    def time_unique_index(self, *args):
+        run(ck.unique_index, self.df)
+
+
+class WithinSet(_Check):
+
+    def setup(self, n_rows, n_cols, dtype, fail_rate):
+        super(WithinSet, self).setup(n_rows, n_cols, dtype, fail_rate)
+        self.items = {c: allowed(dtype) for c in self.df}
+
+    def time_within_set(self, *args):
+        run(ck.within_set, self.df, self.items)
+
+
+class WithinRange(_Check):
+
+    def setup(self, n_rows, n_cols, dtype, fail_rate):
+        if dtype == 'category':
+            skip('unordered categoricals have no range')
+        super(WithinRange, self).setup(n_rows, n_cols, dtype, fail_rate)
+        self.items = {c: bounds(dtype) for c in self.df}
+
+    def time_within_range(self, *args):
+        run(ck.within_range, self.df, self.items)
+
+
+class WithinNStd(_Check):
+    params = [N_ROWS, N_COLS, ['float', 'int'], FAIL_RATES]
+
+    def time_within_n_std(self, *args):
+        run(ck.within_n_std, self.df, 3)
+
+
+class HasDtypes(_Check):
+    params = [N_ROWS, N_COLS, DTYPES]
+    param_names = ['n_rows', 'n_cols', 'dtype']
+
+    def setup(self, n_rows, n_cols, dtype):
+        self.df = make_frame(n_rows, n_cols, dtype)
+        self.items = self.df.dtypes.to_dict()
+
+    def time_has_dtypes(self, *args):
+        ck.has_dtypes(self.df, self.items)
+
+
+class OneToMany(_Check):
+    params = [N_ROWS, DTYPES, FAIL_RATES]
+    param_names = ['n_rows', 'dtype', 'fail_rate']
+
+    def setup(self, n_rows, dtype, fail_rate):
+        check_size(n_rows, 2, dtype)
+        many = make_frame(n_rows, 1, dtype, layout='unique')['c0']
+        unit = np.arange(n_rows) % 50
+        df = pd.DataFrame({'many': many, 'unit': unit})
+        n_bad = int(fail_rate * n_rows)
+        bad = df.iloc[:n_bad].assign(unit=-1)
+        self.df = pd.concat([df, bad])
+
+    def time_one_to_many(self, *args):
+        run(ck.one_to_many, self.df, 'unit', 'many')
+
+
+class IsSameAs(_Check):
+
+    def setup(self, n_rows, n_cols, dtype, fail_rate):
+        check_size(2 * n_rows, n_cols, dtype)
+        super(IsSameAs, self).setup(n_rows, n_cols, dtype, 0)
+        self.other = make_frame(n_rows, n_cols, dtype, fail_rate)
+
+    def time_is_same_as(self, *args):
+        run(ck.is_same_as, self.df, self.other)
+
+
+class IsCloseTo(_Check):
+
+    def setup(self, n_rows, n_cols, dtype, fail_rate):
+        check_size(2 * n_rows, n_cols, dtype)
+        super(IsCloseTo, self).setup(n_rows, n_cols, dtype, 0)
+        self.other = make_frame(n_rows, n_cols, dtype, fail_rate)
+
+    def time_is_close_to(self, *args):
+        run(ck.is_close_to, self.df, self.other)
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Frames for the benchmarks.
+
+Run the suite with ``asv run`` (or ``asv dev`` for a quick pass) from
+the ``asv_bench`` directory. Parameter combinations that would need more
+than ``MAX_CELLS`` cells (``MAX_OBJECT_CELLS`` for object columns) are
+skipped, as are combinations that make no sense for a check, like
+missing values in an integer column.
+"""
+import numpy as np
+import pandas as pd
+
+N_ROWS = [10 ** 3, 10 ** 5, 10 ** 7, 10 ** 8]
+N_COLS = [1, 10]
+DTYPES = ['float', 'int', 'category', 'object', 'datetime']
+FAIL_RATES = [0, 0.01]
+
+MAX_CELLS = 10 ** 8
+MAX_OBJECT_CELLS = 10 ** 7
+
+LETTERS = list('abcdefghij')
+EPOCH = pd.Timestamp('2000-01-01')
+
+
+def skip(reason=''):
+    # asv skips a parameter combination when setup raises this
+    raise NotImplementedError(reason)
+
+
+def check_size(n_rows, n_cols, dtype, layout='random'):
+    cells = n_rows * n_cols
+    strings = dtype == 'object' or (dtype == 'category' and
+                                    layout == 'unique')
+    if cells > MAX_CELLS or (strings and cells > MAX_OBJECT_CELLS):
+        skip('too big')
+
+
+def names(n):
+    """``n`` distinct strings, starting with ``LETTERS``."""
+    return LETTERS[:n] + [str(i) for i in range(len(LETTERS), n)]
+
+
+def from_codes(codes, dtype):
+    """
+    Column of ``dtype`` with a value for each of the integer ``codes``.
+    """
+    if dtype == 'float':
+        return codes.astype(float)
+    elif dtype == 'int':
+        return codes
+    elif dtype == 'category':
+        return pd.Categorical.from_codes(codes, names(codes.max() + 1))
+    elif dtype == 'object':
+        return np.array(names(codes.max() + 1), dtype=object)[codes]
+    elif dtype == 'datetime':
+        return EPOCH + pd.to_timedelta(codes, unit='s')
+    raise ValueError(dtype)
+
+
+def allowed(dtype):
+    """The values ``make_frame`` draws from, i.e. ``from_codes(0..9)``."""
+    return list(from_codes(np.arange(len(LETTERS)), dtype))
+
+
+def bounds(dtype):
+    values = allowed(dtype)
+    return values[0], values[-1]
+
+
+def make_frame(n_rows, n_cols, dtype, fail_rate=0, fail='missing',
+               layout='random', seed=0):
+    """
+    A frame of ``n_cols`` columns of ``dtype``.
+
+    Parameters
+    ----------
+    fail_rate : float
+      fraction of the rows to break in every column
+    fail : {'missing', 'value'}
+      break rows by making them missing, or by giving them a value
+      outside the ones ``allowed`` and ``bounds`` describe
+    layout : {'random', 'sorted', 'unique'}
+      values drawn from the 10 ``allowed`` ones, the same sorted, or
+      distinct values
+    """
+    check_size(n_rows, n_cols, dtype, layout)
+    if fail_rate and fail == 'missing' and dtype == 'int':
+        skip("int columns can't hold missing values")
+    rng = np.random.RandomState(seed)
+    n_bad = int(fail_rate * n_rows)
+    data = {}
+    for i in range(n_cols):
+        if layout == 'unique':
+            codes = rng.permutation(n_rows)
+        else:
+            codes = rng.randint(0, len(LETTERS), n_rows)
+            if layout == 'sorted':
+                codes.sort()
+        bad = rng.choice(n_rows, n_bad, replace=False)
+        if fail == 'value' and n_bad:
+            codes[bad] = codes.max() + 99
+        column = pd.Series(from_codes(codes, dtype))
+        if fail == 'missing' and n_bad:
+            column[bad] = None
+        data['c{}'.format(i)] = column
+    return pd.DataFrame(data)
+
+
+def run(check, *args, **kwargs):
+    """Run ``check``, swallowing the failures the frame was built with."""
+    try:
+        check(*args, **kwargs)
+    except AssertionError:
+        pass
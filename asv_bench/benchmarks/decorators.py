@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Overhead the decorators add on top of the checks they run.
+"""
+import engarde.decorators as dc
+from engarde.config import set_options
+from engarde.sampling import Sample
+from engarde.schema import Schema
+
+from .common import make_frame
+
+
+def _noop(df):
+    return df
+
+
+class Overhead(object):
+    params = [[10, 10 ** 6]]
+    param_names = ['n_rows']
+
+    def setup(self, n_rows):
+        self.df = make_frame(n_rows, 5, 'float')
+        items = {c: (0, 9) for c in self.df}
+        self.single = dc.none_missing()(_noop)
+        self.stacked = dc.is_shape((-1, 5))(
+            dc.within_range(items)(
+                dc.unique(['c0'])(
+                    dc.none_missing()(_noop))))
+        self.sampled = dc.none_missing(sample=Sample(every=100))(_noop)
+        columns = {c: {'nullable': False, 'range': (0, 9)} for c in self.df}
+        columns['c0']['unique'] = True
+        self.schema = Schema(columns)(_noop)
+
+    def time_undecorated(self, n_rows):
+        _noop(self.df)
+
+    def time_single(self, n_rows):
+        self.single(self.df)
+
+    def time_stacked(self, n_rows):
+        try:
+            self.stacked(self.df)
+        except AssertionError:
+            pass
+
+    def time_schema(self, n_rows):
+        try:
+            self.schema(self.df)
+        except AssertionError:
+            pass
+
+    def time_sampled(self, n_rows):
+        self.sampled(self.df)
+
+    def time_level_off(self, n_rows):
+        with set_options(level='off'):
+            self.stacked(self.df)
+
+    def time_level_cheap(self, n_rows):
+        with set_options(level='cheap'):
+            self.stacked(self.df)
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+The generic checks and helpers in ``engarde.generic``.
+"""
+import numpy as np
+import pandas as pd
+
+from engarde import generic
+
+from .common import N_ROWS, N_COLS, FAIL_RATES, check_size, make_frame, run
+
+
+class Verify(object):
+    params = [N_ROWS, N_COLS, FAIL_RATES]
+    param_names = ['n_rows', 'n_cols', 'fail_rate']
+
+    def setup(self, n_rows, n_cols, fail_rate):
+        self.df = make_frame(n_rows, n_cols, 'float', fail_rate, 'value')
+
+    def time_verify(self, *args):
+        run(generic.verify, self.df, lambda df: (df < 10).all().all())
+
+    def time_verify_all(self, *args):
+        run(generic.verify_all, self.df, lambda df: df < 10)
+
+    def time_verify_any(self, *args):
+        run(generic.verify_any, self.df, lambda df: df > 10)
+
+    def time_verify_expr(self, *args):
+        run(generic.verify_expr, self.df,
+            ' & '.join('{} < 10'.format(c) for c in self.df))
+
+
+class BadLocations(object):
+    params = [N_ROWS, N_COLS, [1e-6, 1e-3, 0.1]]
+    param_names = ['n_rows', 'n_cols', 'fail_rate']
+
+    def setup(self, n_rows, n_cols, fail_rate):
+        check_size(n_rows, n_cols, 'float')
+        rng = np.random.RandomState(0)
+        self.mask = pd.DataFrame(rng.random_sample((n_rows, n_cols)) <
+                                 fail_rate)
+
+    def time_bad_locations(self, *args):
+        generic.bad_locations(self.mask)
+
+    def time_bad_locations_limit(self, *args):
+        generic.bad_locations(self.mask, limit=100)
+
+
+class HasMissing(object):
+    params = [N_ROWS, ['float', 'int', 'category', 'object', 'datetime']]
+    param_names = ['n_rows', 'dtype']
+
+    def setup(self, n_rows, dtype):
+        self.s = make_frame(n_rows, 1, dtype)['c0']
+
+    def time_has_missing(self, *args):
+        generic.has_missing(self.s)
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+"""
+Import time of the package, each in a fresh interpreter. The budget for
+what engarde adds on top of pandas is enforced in tests/test_imports.py.
+"""
+
+
+class Import(object):
+
+    def timeraw_import_pandas(self):
+        return "import pandas"
+
+    def timeraw_import_checks(self):
+        return "import engarde.checks"
+
+    def timeraw_import_decorators(self):
+        return "import engarde.decorators"
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+``one_to_many`` should scale linearly in the number of rows: the time per
+row stays flat as ``n_rows`` grows by factors of ten.
+"""
+import numpy as np
+import pandas as pd
+
+import engarde.checks as ck
+
+
+class OneToMany(object):
+
+    params = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+    param_names = ['n_rows']
+
+    def setup(self, n_rows):
+        rng = np.random.RandomState(0)
+        employees = np.arange(n_rows)
+        self.df = pd.DataFrame({
+            'employee': employees,
+            'department': employees % 50,
+            'salary': rng.randn(n_rows),
+        })
+        bad = self.df.copy()
+        bad.loc[::1000, 'department'] = -1
+        self.bad = pd.concat([self.df, bad])
+
+    def time_one_to_many(self, n_rows):
+        ck.one_to_many(self.df, 'department', 'employee')
+
+    def time_one_to_many_fails(self, n_rows):
+        try:
+            ck.one_to_many(self.bad, 'department', 'employee')
+        except AssertionError:
+            pass
+
+
+class OneToManyStreaming(object):
+    """
+    Streamed, the time per chunk should stay flat however many keys
+    earlier chunks have seen.
+    """
+
+    params = [10, 100, 1000]
+    param_names = ['n_chunks']
+
+    def setup(self, n_chunks):
+        from engarde.plan import CheckPlan
+        employees = np.arange(n_chunks * 1000)
+        df = pd.DataFrame({'employee': employees,
+                           'department': employees % 50})
+        self.chunks = [df.iloc[i:i + 1000] for i in range(0, len(df), 1000)]
+        self.plan = CheckPlan().add(ck.one_to_many, 'department', 'employee')
+
+    def time_one_to_many_streaming(self, n_chunks):
+        from engarde.streaming import validate_chunks
+        validate_chunks(self.chunks, self.plan)
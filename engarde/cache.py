@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+cache.py
+
+Opt-in memoization of checks that passed, for frames flowing unchanged
+through several decorated functions.
+
+>>> set_options(cache_size=256)
+
+With a non-zero ``cache_size``, every check run through a ``CheckPlan``
+(which includes all the decorators) first looks for an earlier pass of
+the same check, with the same arguments, on the same frame, and returns
+at once if there is one. Failures aren't cached.
+
+A frame counts as unchanged while it is the same object with the same
+index, columns and underlying arrays, which is what assigning a column,
+renaming, reindexing or most ``inplace=True`` methods change. Writes
+into the existing arrays, e.g. ``df.iloc[0, 0] = x``, go unnoticed, so
+only enable the cache for pipelines that don't modify frames that way.
+
+Entries only hold weak references, so cached frames aren't kept alive,
+and the least recently used entries are evicted beyond ``cache_size``.
+Only checks whose arguments can't change are cached: scalars, dtypes,
+functions, ``ValueSet`` objects, and lists, tuples, sets and dicts of
+those. Others, e.g. the frame of ``is_same_as`` or the ``RunningStats``
+of ``within_n_std``, could change without the key changing.
+"""
+from __future__ import (unicode_literals, absolute_import, division)
+
+from collections import OrderedDict
+import datetime
+import threading
+import types
+import weakref
+
+import numpy as np
+import pandas as pd
+import six
+
+from engarde.config import options
+from engarde.generic import ValueSet
+
+# (id of the frame, check, arguments) -> weak references to the parts
+# of the frame it passed on
+_entries = OrderedDict()
+_lock = threading.Lock()
+
+
+# arguments that can't change, and so stand for themselves in a key
+_IMMUTABLE = ((type(None), bool, float, complex, six.text_type, bytes,
+               np.generic, np.dtype, pd.api.extensions.ExtensionDtype, type,
+               datetime.date, datetime.time, datetime.timedelta,
+               types.FunctionType, types.BuiltinFunctionType, np.ufunc,
+               ValueSet) + six.integer_types)
+
+
+def _freeze(obj):
+    """
+    A hashable equivalent of ``obj``; raises TypeError if it could
+    change.
+    """
+    if isinstance(obj, dict):
+        return frozenset((_freeze(k), _freeze(v)) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return tuple(_freeze(v) for v in obj)
+    if isinstance(obj, (set, frozenset)):
+        return frozenset(_freeze(v) for v in obj)
+    if not isinstance(obj, _IMMUTABLE):
+        raise TypeError("{!r} may change".format(obj))
+    hash(obj)
+    return obj
+
+
+def _parts(df):
+    """The objects whose identity stands for the contents of ``df``."""
+    mgr = df._mgr if hasattr(df, '_mgr') else df._data
+    return [df, df.index, df.columns] + [blk.values for blk in mgr.blocks]
+
+
+def key(step, df):
+    """
+    The cache key for running ``step`` on ``df``, or None if it can't
+    be cached.
+    """
+    try:
+        return (id(df), step.check, _freeze(step.args),
+                _freeze(step.kwargs))
+    except TypeError:
+        return None
+
+
+def hit(key, df):
+    """
+    Whether the check of ``key`` already passed on ``df`` as it is now.
+    """
+    with _lock:
+        refs = _entries.get(key)
+        if refs is None:
+            return False
+        parts = _parts(df)
+        if (len(refs) != len(parts) or
+                any(ref() is not part for ref, part in zip(refs, parts))):
+            del _entries[key]
+            return False
+        # mark as most recently used
+        _entries[key] = _entries.pop(key)
+        return True
+
+
+def store(key, df):
+    """
+    Record that the check of ``key`` passed on ``df``.
+    """
+    try:
+        refs = [weakref.ref(part) for part in _parts(df)]
+    except TypeError:
+        return
+    with _lock:
+        _entries.pop(key, None)
+        _entries[key] = refs
+        while len(_entries) > options['cache_size']:
+            _entries.popitem(last=False)
+
+
+def clear():
+    """
+    Forget every cached pass.
+    """
+    with _lock:
+        _entries.clear()
+
+
+__all__ = ['clear']
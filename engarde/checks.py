@@ -10,11 +10,10 @@ Each function in here should
 """
 import numpy as np
 import pandas as pd
-import pandas.util.testing as tm
-import six
 
 from engarde import generic
-from engarde.generic import verify, verify_all, verify_any
+from engarde.diff import diff_frames, numeric_errors
+from engarde.generic import verify, verify_all, verify_any, verify_expr
 
 
 def none_missing(df, columns=None):
@@ -34,19 +33,22 @@ def none_missing(df, columns=None):
     """
     if columns is None:
         columns = df.columns
-    try:
-        assert not df[columns].isnull().any().any()
-    except AssertionError as e:
-        missing = df[columns].isnull()
-        msg = generic.bad_locations(missing)
-        e.args = msg
-        raise
+    bad = [col for col in pd.unique(list(columns))
+           if generic.has_missing(df[col])]
+    if bad:
+        # only the columns with missing values contribute to the report
+        missing = df[bad].isnull()
+        raise AssertionError(*generic.bad_locations(missing))
     return df
 
 def is_monotonic(df, items=None, increasing=None, strict=False):
     """
     Asserts that the DataFrame is monotonic.
 
+    Each column is checked in a single sweep that determines whether it
+    is increasing, decreasing and strictly so at once, without copying
+    it. Missing values break monotonicity.
+
     Parameters
     ==========
 
@@ -60,30 +62,74 @@ def is_monotonic(df, items=None, increasing=None, strict=False):
     Returns
     =======
     df : DataFrame
+
+    Raises
+    ======
+    AssertionError
+        with the pair of values around the first violation
     """
     if items is None:
         items = {k: (increasing, strict) for k in df}
 
     for col, (increasing, strict) in items.items():
         s = pd.Index(df[col])
+        # both directions come out of the same pass, and a strictly
+        # monotonic index knows it's unique without hashing
+        inc = s.is_monotonic_increasing
+        dec = s.is_monotonic_decreasing
         if increasing:
-            good = getattr(s, 'is_monotonic_increasing')
+            good = inc
         elif increasing is None:
-            good = getattr(s, 'is_monotonic') | getattr(s, 'is_monotonic_decreasing')
+            good = inc or dec
         else:
-            good = getattr(s, 'is_monotonic_decreasing')
-        if strict:
-            if increasing:
-                good = good & (s.to_series().diff().dropna() > 0).all()
-            elif increasing is None:
-                good = good & ((s.to_series().diff().dropna() > 0).all() |
-                               (s.to_series().diff().dropna() < 0).all())
-            else:
-                good = good & (s.to_series().diff().dropna() < 0).all()
+            good = dec
+        if good and strict:
+            good = s.is_unique
         if not good:
-            raise AssertionError
+            pos = _first_unordered(df[col], increasing, strict)
+            msg = "Column {!r} is not monotonic at position {}".format(col,
+                                                                     pos)
+            raise AssertionError(msg, df[col].iloc[max(pos - 1, 0):pos + 1])
     return df
 
+
+def _first_unordered(s, increasing, strict):
+    """
+    Position of the first value of ``s`` out of order with the one
+    before it; with ``increasing=None``, the first out of order in both
+    directions.
+    """
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        values = s.cat.codes.values.astype(float)
+        values[values < 0] = np.nan
+    else:
+        values = np.asarray(s)
+    # pandas comparisons treat missing values as unordered for any dtype
+    prev, nxt = pd.Series(values[:-1]), pd.Series(values[1:])
+    firsts = []
+    for direction in ([True, False] if increasing is None else [increasing]):
+        try:
+            bad = np.flatnonzero(~_ordered(prev, nxt, direction,
+                                           strict).values)
+        except TypeError:
+            # mixed types, like str and int; those that can't be compared
+            # are out of order
+            bad = [i for i, (a, b) in enumerate(zip(values[:-1], values[1:]))
+                   if not _pair_ordered(a, b, direction, strict)]
+        firsts.append(bad[0] + 1 if len(bad) else 0)
+    return max(firsts)
+
+def _ordered(prev, nxt, increasing, strict):
+    if increasing:
+        return nxt > prev if strict else nxt >= prev
+    return nxt < prev if strict else nxt <= prev
+
+def _pair_ordered(prev, nxt, increasing, strict):
+    try:
+        return bool(_ordered(prev, nxt, increasing, strict))
+    except TypeError:
+        return False
+
 def is_shape(df, shape):
     """
     Asserts that the DataFrame is of a known shape.
@@ -150,7 +196,7 @@ def unique_index(df):
     try:
         assert df.index.is_unique
     except AssertionError as e:
-        e.args = df.index.get_duplicates()
+        e.args = df.index[df.index.duplicated()].unique()
         raise
     return df
 
@@ -164,16 +210,17 @@ def within_set(df, items=None):
     df : DataFrame
     items : dict
       mapping of columns (k) to array-like of values (v) that
-      ``df[k]`` is expected to be a subset of
+      ``df[k]`` is expected to be a subset of. Pass a
+      ``generic.ValueSet`` to reuse the compiled set across calls.
 
     Returns
     =======
     df : DataFrame
     """
     for k, v in items.items():
-        if not df[k].isin(v).all():
-            bad = df.loc[~df[k].isin(v), k]
-            raise AssertionError('Not in set', bad)
+        found = generic.ValueSet.of(v).contains(df[k])
+        if not found.all():
+            raise AssertionError('Not in set', df.loc[~found, k])
     return df
 
 def within_range(df, items=None):
@@ -191,13 +238,47 @@ def within_range(df, items=None):
     =======
     df : DataFrame
     """
+    lows, highs = _extremes(df, list(items))
     for k, (lower, upper) in items.items():
-        if (lower > df[k]).any() or (upper < df[k]).any():
+        try:
+            # NaN extremes, for all-missing columns, compare False
+            good = not (lower > lows[k] or upper < highs[k])
+        except (KeyError, TypeError):
+            # not reducible, e.g. strings mixed with None
+            good = False
+        if not good:
             bad = (lower > df[k]) | (upper < df[k])
-            raise AssertionError("Outside range", bad)
+            if bad.any():
+                raise AssertionError("Outside range", bad)
     return df
 
-def within_n_std(df, n=3):
+
+def _extremes(df, columns):
+    """
+    Min and max of each of ``columns``, as two dicts, computed with one
+    reduction each and no temporaries. When the columns make up most of
+    the numeric columns of ``df``, those are reduced block by block;
+    any others one at a time. Columns that can't be reduced are left
+    out.
+    """
+    lows, highs = {}, {}
+    numeric = [col for col, dtype in df.dtypes.items()
+               if pd.api.types.is_numeric_dtype(dtype)]
+    keep = set(columns)
+    wanted = [col for col in numeric if col in keep]
+    if len(wanted) > 1 and 2 * len(wanted) >= len(numeric):
+        lows.update(df.min(numeric_only=True)[wanted].items())
+        highs.update(df.max(numeric_only=True)[wanted].items())
+    for col in columns:
+        if col in lows:
+            continue
+        try:
+            lows[col], highs[col] = df[col].min(), df[col].max()
+        except TypeError:
+            pass
+    return lows, highs
+
+def within_n_std(df, n=3, stats=None):
     """
     Assert that every value is within ``n`` standard
     deviations of its column's mean.
@@ -207,19 +288,61 @@ def within_n_std(df, n=3):
     df : DataFame
     n : int
       number of standard deviations from the mean
+    stats : object, optional
+      fitted parameters, with ``mean`` and ``std`` Series indexed by
+      column, e.g. a ``streaming.RunningStats`` of a reference dataset.
+      By default they're computed from ``df`` itself.
 
     Returns
     =======
     df : DataFrame
     """
-    means = df.mean()
-    stds = df.std()
-    inliers = (np.abs(df[means.index] - means) < n * stds)
+    if stats is None:
+        means = df.mean()
+        stds = df.std()
+    else:
+        means, stds = stats.mean, stats.std
+    columns = list(means.index)
+    bounds = n * stds
+    # every value is an inlier iff both extremes are; numpy's min and max
+    # propagate NaN, so a missing value fails the comparison too
+    for col in columns:
+        values = df[col].values
+        try:
+            lower, upper = values.min(), values.max()
+            good = (means[col] - lower < bounds[col] and
+                    upper - means[col] < bounds[col])
+        except (TypeError, ValueError):
+            good = False
+        if not good:
+            break
+    else:
+        return df
+    inliers = (np.abs(df[columns] - means) < bounds)
     if not np.all(inliers):
         msg = generic.bad_locations(~inliers)
         raise AssertionError(msg)
     return df
 
+def has_columns(df, columns):
+    """
+    Assert that a DataFrame has ``columns``
+
+    Parameters
+    ==========
+    df : DataFrame
+    columns : list
+
+    Returns
+    =======
+    df : DataFrame
+    """
+    missing = [col for col in columns if col not in df.columns]
+    if missing:
+        raise AssertionError("Columns not in the DataFrame", missing)
+    return df
+
+
 def has_dtypes(df, items):
     """
     Assert that a DataFrame has ``dtypes``
@@ -262,16 +385,87 @@ def one_to_many(df, unitcol, manycol):
     =======
     df : DataFrame
 
+    Raises
+    ======
+    AssertionError
+        with a Series mapping every offending value of ``manycol``
+        to the distinct ``unitcol`` values it appears with.
     """
     subset = df[[manycol, unitcol]].drop_duplicates()
-    for many in subset[manycol].unique():
-        if subset[subset[manycol] == many].shape[0] > 1:
-            msg = "{} in {} has multiple values for {}".format(many, manycol, unitcol)
-            raise AssertionError(msg)
+    many = subset[manycol]
+    # missing values in ``manycol`` never belong to a group
+    dupes = many.duplicated(keep=False) & many.notnull()
+    if dupes.any():
+        bad = subset[dupes].groupby(manycol, sort=False)[unitcol].unique()
+        keys = ', '.join(map(str, bad.index[:10]))
+        if len(bad) > 10:
+            keys += ', ... ({} total)'.format(len(bad))
+        msg = "{} in {} has multiple values for {}".format(keys, manycol,
+                                                           unitcol)
+        raise AssertionError(msg, bad)
+
+    return df
+
+
+def is_close_to(df, df_to_compare, rtol=1e-5, atol=1e-8, n_rows=10,
+                n_jobs=1):
+    """
+    Assert that the numeric columns of two DataFrames are close, that is
+    ``|df - df_to_compare| <= atol + rtol * |df_to_compare|`` or both
+    are missing, as in ``np.isclose``.
+
+    Parameters
+    ==========
+    df : DataFrame
+    df_to_compare : DataFrame
+      with the same number of rows, and at least the numeric columns of
+      ``df``; rows are matched by position
+    rtol, atol : float
+      relative and absolute tolerances
+    n_rows : int
+      number of worst rows reported on failure
+    n_jobs : int, optional
+      number of threads comparing the columns of wide frames; None or
+      less than one means one per CPU
+
+    Returns
+    =======
+    df : DataFrame
 
+    Raises
+    ======
+    AssertionError
+        with the maximum absolute and relative error of the columns that
+        aren't close, and the rows with the largest absolute errors
+    """
+    numeric = [col for col, dtype in df.dtypes.items()
+               if pd.api.types.is_numeric_dtype(dtype)]
+    missing = [col for col in numeric if col not in df_to_compare]
+    if missing:
+        raise AssertionError("Columns missing from df_to_compare", missing)
+    other = [col for col in numeric
+             if not pd.api.types.is_numeric_dtype(df_to_compare[col])]
+    if other:
+        raise AssertionError("Columns not numeric in df_to_compare", other)
+    if len(df) != len(df_to_compare):
+        raise AssertionError("Expected {} rows, got {}".format(
+            len(df), len(df_to_compare)))
+    errors, worst = numeric_errors(df, df_to_compare, rtol=rtol, atol=atol,
+                                   n_rows=n_rows, n_jobs=n_jobs)
+    bad = errors[errors['not_close'] > 0]
+    if len(bad):
+        raise AssertionError("Not close", bad, worst)
     return df
 
 
+# arguments of ``assert_frame_equal`` that only matter to frames whose
+# index, columns or dtypes differ, or that set the tolerance of values
+_STRUCTURAL_KWARGS = {'check_dtype', 'check_index_type', 'check_column_type',
+                      'check_frame_type', 'check_names', 'check_like',
+                      'check_freq', 'check_flags', 'check_exact', 'rtol',
+                      'atol', 'obj'}
+
+
 def is_same_as(df, df_to_compare, **kwargs):
     """
     Assert that two pandas dataframes are the equal
@@ -287,15 +481,56 @@ def is_same_as(df, df_to_compare, **kwargs):
     =======
     df : DataFrame
 
+    Notes
+    =====
+    Frames with the same columns, index and dtypes are compared block by
+    block on their raw bytes (or row hashes for object and extension
+    columns), and the columns with differing blocks are then compared
+    value by value with ``engarde.diff.diff_frames``, using the tolerance
+    in ``kwargs``. Other frames, or other ``kwargs``, go through
+    ``assert_frame_equal``.
+
+    On failure, the error holds an ``engarde.diff.FrameDiff``: the
+    differing columns, the number of differing cells in each and the
+    first differing rows, computed in bounded memory.
     """
+    blocks = generic.differing_blocks(df, df_to_compare)
+    if (blocks is not None and set(kwargs) <= _STRUCTURAL_KWARGS and
+            df.columns.is_unique):
+        # only values can differ, which the diff decides in bounded memory
+        if not blocks:
+            return df
+        if kwargs.get('check_exact'):
+            rtol = atol = 0
+        else:
+            rtol, atol = kwargs.get('rtol', 1e-5), kwargs.get('atol', 1e-8)
+        # only the differing blocks are compared again
+        columns = [df.columns[j] for j in sorted({j for j, _, _ in blocks})]
+        ranges = sorted({(start, stop) for _, start, stop in blocks})
+        diff = diff_frames(df, df_to_compare, rtol=rtol, atol=atol,
+                           columns=columns, ranges=ranges)
+        if not diff.equal:
+            raise AssertionError("DataFrames are not equal", diff)
+        return df
+    # imported here, as the testing modules are slow to import
+    try:
+        from pandas.testing import assert_frame_equal
+    except ImportError:
+        from pandas.util.testing import assert_frame_equal
     try:
-        tm.assert_frame_equal(df, df_to_compare, **kwargs)
+        assert_frame_equal(df, df_to_compare, **kwargs)
     except AssertionError as exc:
-        six.raise_from(AssertionError("DataFrames are not equal"), exc)
+        try:
+            diff = diff_frames(df, df_to_compare)
+        except Exception:
+            # pandas' own message is the best there is
+            raise exc
+        import six
+        six.raise_from(AssertionError("DataFrames are not equal", diff), exc)
     return df
 
 
 __all__ = ['is_monotonic', 'is_same_as', 'is_shape', 'none_missing',
            'unique_index', 'within_n_std', 'within_range', 'within_set',
-           'has_dtypes', 'verify', 'verify_all', 'verify_any',
-           'one_to_many','is_same_as',]
+           'has_columns', 'has_dtypes', 'verify', 'verify_all', 'verify_any', 'verify_expr',
+           'one_to_many', 'is_close_to', 'is_same_as',]
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Package-wide options.
+
+The ``level`` option switches checks on and off globally:
+
+- ``'all'``: run every check (the default)
+- ``'cheap'``: only run checks in ``CHEAP_CHECKS``, which look at the
+  frame's metadata rather than its values
+- ``'off'``: run no checks
+
+Its default comes from the ``ENGARDE_LEVEL`` environment variable,
+where ``cheap-only`` also means ``'cheap'``; an unknown value warns and
+runs every check.
+If ``ENGARDE_LEVEL=off`` when a function is decorated, the decorator
+returns the function untouched, so the checks cost nothing at all (and
+can't be switched back on for that function).
+
+The ``disabled`` option holds the names of individual checks to skip,
+e.g. ``{'within_n_std'}``.
+
+The ``cache_size`` option turns on memoization of passing checks, see
+``engarde.cache``.
+
+Use ``set_options`` to change options, for good or within a block:
+
+>>> set_options(level='cheap')
+>>> with set_options(level='off', report_limit=100):
+...     run_pipeline()
+"""
+import os
+import warnings
+
+LEVELS = ('off', 'cheap', 'all')
+
+# checks that only look at metadata, run at the 'cheap' level
+CHEAP_CHECKS = {'is_shape', 'has_columns', 'has_dtypes'}
+
+
+# other spellings of the levels accepted in ENGARDE_LEVEL
+_ALIASES = {'cheap-only': 'cheap', 'cheap_only': 'cheap'}
+
+
+def _env_level():
+    level = os.environ.get('ENGARDE_LEVEL', 'all').strip().lower()
+    level = _ALIASES.get(level, level)
+    if level not in LEVELS:
+        # a misconfigured environment shouldn't break every import
+        warnings.warn("ENGARDE_LEVEL must be one of {}, got {!r}; running "
+                      "all checks".format(LEVELS, level), RuntimeWarning)
+        return 'all'
+    return level
+
+
+options = {
+    # the most failing locations to report; None reports them all
+    'report_limit': None,
+    # which checks to run, one of LEVELS
+    'level': _env_level(),
+    # names of checks to skip whatever the level
+    'disabled': frozenset(),
+    # how many passing checks to remember, see engarde.cache; 0 disables
+    'cache_size': 0,
+}
+
+_VALIDATORS = {
+    'report_limit': lambda v: v is None or v >= 0,
+    'level': lambda v: v in LEVELS,
+    'disabled': lambda v: not isinstance(v, str),
+    'cache_size': lambda v: int(v) == v and v >= 0,
+}
+
+
+class set_options(object):
+    """
+    Set options, for good or, used as a context manager, within a block.
+    """
+
+    def __init__(self, **kwargs):
+        self.old = {}
+        for k, v in kwargs.items():
+            if k not in options:
+                raise KeyError("Unknown option {!r}".format(k))
+            if not _VALIDATORS[k](v):
+                raise ValueError("Invalid value for {!r}: {!r}".format(k, v))
+        for k, v in kwargs.items():
+            if k == 'disabled':
+                v = frozenset(v)
+            self.old[k] = options[k]
+            options[k] = v
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        options.update(self.old)
+
+
+def bypassed():
+    """
+    Whether decorators should skip wrapping altogether
+    (``ENGARDE_LEVEL=off``).
+    """
+    return os.environ.get('ENGARDE_LEVEL', '').strip().lower() == 'off'
+
+
+__all__ = ['options', 'set_options', 'LEVELS', 'CHEAP_CHECKS']
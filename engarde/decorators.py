@@ -1,87 +1,124 @@
 # -*- coding: utf-8 -*-
+"""
+Decorator versions of the checks in ``engarde.checks``.
+
+Every decorator takes a ``sample`` keyword, an ``engarde.sampling.Sample``
+policy limiting how often, and on how many rows, its check runs, and a
+``store`` keyword, an ``engarde.store.ResultStore`` (or the path to one)
+remembering outcomes across runs. The ``verify*`` decorators don't pass
+these keywords on to the predicate, so a predicate can't take arguments
+with those names.
+Checks can be switched off globally with ``engarde.config.set_options``
+or the ``ENGARDE_LEVEL`` environment variable.
+"""
 from __future__ import (unicode_literals, absolute_import, division)
 
 from functools import wraps
+import weakref
 
 import engarde.checks as ck
+from engarde import config
+from engarde.config import options
+from engarde.generic import ValueSet
+from engarde.plan import CheckPlan, Step
 
-def none_missing(columns=None):
-    """Asserts that no missing values (NaN) are found"""
-    def decorate(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            result = func(*args, **kwargs)
-            ck.none_missing(result, columns=columns)
-            return result
-        return wrapper
-    return decorate
+# Maps each wrapper made here to (undecorated function, CheckPlan), so
+# that stacking another decorator on top extends the plan instead of
+# adding a second wrapper and a second scan of the result.
+_PLANS = weakref.WeakKeyDictionary()
+
+
+def _checked(check, sample, store, *args, **kwargs):
+    """
+    Build a decorator running ``check(result, *args, **kwargs)`` on the
+    result of the decorated function, subject to the sampling policy
+    ``sample``, and looking up and recording outcomes in ``store``.
+
+    Stacked engarde decorators share a single ``CheckPlan``; the checks
+    still run in the same order as if each decorator wrapped the next.
+    """
+    if store is not None:
+        # sqlite3 and the hashing machinery only load when a store is used
+        from engarde.store import ResultStore
+        store = ResultStore.of(store)
 
+    def steps(label):
+        return [Step(check, args, kwargs, sample=sample, label=label,
+                     store=store)]
+    return _decorator(steps)
 
-def is_shape(shape):
+
+def _decorator(steps):
+    """
+    Build a decorator running the ``Step`` objects returned by
+    ``steps(label)`` on the result of the decorated function, where
+    ``label`` names the function.
+    """
     def decorate(func):
+        if config.bypassed():
+            return func
+        try:
+            inner, plan = _PLANS[func]
+        except (KeyError, TypeError):
+            inner, plan = func, CheckPlan()
+        label = '{}.{}'.format(getattr(inner, '__module__', None),
+                               getattr(inner, '__name__', inner))
+        plan = plan.extend(CheckPlan(steps(label)))
+        # the plan to run at each level, None when there's nothing to run
+        plans = {level: plan.at_level(level) or None
+                 for level in config.LEVELS}
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            result = func(*args, **kwargs)
-            ck.is_shape(result, shape)
+            result = inner(*args, **kwargs)
+            active = plans[options['level']]
+            if active is not None:
+                active.validate(result)
             return result
+        _PLANS[wrapper] = (inner, plan)
         return wrapper
     return decorate
 
 
-def unique(columns=None):
+def none_missing(columns=None, sample=None, store=None):
+    """Asserts that no missing values (NaN) are found"""
+    return _checked(ck.none_missing, sample, store, columns=columns)
+
+
+def is_shape(shape, sample=None, store=None):
+    return _checked(ck.is_shape, sample, store, shape)
+
+
+def unique(columns=None, sample=None, store=None):
     """
     Asserts that columns in the DataFrame only have unique values.
     """
-    def decorate(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            result = func(*args, **kwargs)
-            ck.unique(result, columns=columns)
-            return result
-        return wrapper
-    return decorate
+    return _checked(ck.unique, sample, store, columns=columns)
 
 
-def unique_index():
-    def decorate(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            result = func(*args, **kwargs)
-            ck.unique_index(result)
-            return result
-        return wrapper
-    return decorate
+def unique_index(sample=None, store=None):
+    return _checked(ck.unique_index, sample, store)
 
-def is_monotonic(items=None, increasing=None, strict=False):
-    def decorate(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            result = func(*args, **kwargs)
-            ck.is_monotonic(result, items=items, increasing=increasing,
-                            strict=strict)
-            return result
-        return wrapper
-    return decorate
+def is_monotonic(items=None, increasing=None, strict=False, sample=None,
+                 store=None):
+    return _checked(ck.is_monotonic, sample, store, items=items,
+                    increasing=increasing, strict=strict)
 
-def within_set(items):
+def within_set(items, sample=None, store=None):
     """
     Check that DataFrame values are within set.
 
     >>> @within_set({'A': {1, 3}})
     >>> def f(df):
             return df
+
+    The sets are compiled once, when the function is decorated.
     """
-    def decorate(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            result = func(*args, **kwargs)
-            ck.within_set(result, items)
-            return result
-        return wrapper
-    return decorate
+    items = {k: ValueSet.of(v) for k, v in items.items()}
+    return _checked(ck.within_set, sample, store, items)
 
 
-def within_range(items):
+def within_range(items, sample=None, store=None):
     """
     Check that a DataFrame's values are within a range.
 
@@ -92,103 +129,101 @@ def within_range(items):
         array-like checks the same (lower, upper) for each column
 
     """
-    def decorate(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            result = func(*args, **kwargs)
-            ck.within_range(result, items)
-            return result
-        return wrapper
-    return decorate
+    return _checked(ck.within_range, sample, store, items)
 
 
-def within_n_std(n=3):
+def within_n_std(n=3, stats=None, sample=None, store=None):
     """
     Tests that all values are within 3 standard deviations
-    of their mean.
+    of their mean, or of the mean in the fitted ``stats``.
     """
-    def decorate(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            result = func(*args, **kwargs)
-            ck.within_n_std(result, n=n)
-            return result
-        return wrapper
-    return decorate
+    return _checked(ck.within_n_std, sample, store, n=n, stats=stats)
 
-def has_dtypes(items):
+def has_columns(columns, sample=None, store=None):
+    """
+    Tests that the columns are present.
+    """
+    return _checked(ck.has_columns, sample, store, columns)
+
+
+def has_dtypes(items, sample=None, store=None):
     """
     Tests that the dtypes are as specified in items.
     """
-    def decorate(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            result = func(*args, **kwargs)
-            ck.has_dtypes(result, items)
-            return result
-        return wrapper
-    return decorate
+    return _checked(ck.has_dtypes, sample, store, items)
 
 
-def one_to_many(unitcol, manycol):
+def one_to_many(unitcol, manycol, sample=None, store=None):
     """ Tests that each value in ``manycol`` only is associated with
     just a single value in ``unitcol``.
     """
-    def decorate(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            result = func(*args, **kwargs)
-            ck.one_to_many(result, unitcol, manycol)
-            return result
-        return wrapper
-    return decorate
+    return _checked(ck.one_to_many, sample, store, unitcol, manycol)
 
 
 def verify(func, *args, **kwargs):
     """
     Assert that `func(df, *args, **kwargs)` is true.
+
+    ``sample`` and ``store`` are reserved: they're taken as the
+    decorator's own keywords, never passed on to ``func``.
     """
     return _verify(func, None, *args, **kwargs)
 
 def verify_all(func, *args, **kwargs):
     """
     Assert that all of `func(*args, **kwargs)` are true.
+
+    ``sample`` and ``store`` are reserved, as in ``verify``.
     """
     return _verify(func, 'all', *args, **kwargs)
 
 def verify_any(func, *args, **kwargs):
     """
     Assert that any of `func(*args, **kwargs)` are true.
+
+    ``sample`` and ``store`` are reserved, as in ``verify``.
     """
     return _verify(func, 'any', *args, **kwargs)
 
+def verify_expr(*exprs, **kwargs):
+    """
+    Assert that the expressions in `exprs`, e.g. `'price1 >= 0'`, are
+    true for every row, evaluated together with `DataFrame.eval`.
+    """
+    sample = kwargs.pop('sample', None)
+    store = kwargs.pop('store', None)
+    if kwargs:
+        raise TypeError("verify_expr() got unexpected keyword arguments "
+                        "{}".format(sorted(kwargs)))
+    return _checked(ck.verify_expr, sample, store, *exprs)
+
 def _verify(func, _kind, *args, **kwargs):
     d = {None: ck.verify, 'all': ck.verify_all, 'any': ck.verify_any}
     vfunc = d[_kind]
+    sample = kwargs.pop('sample', None)
+    store = kwargs.pop('store', None)
+    return _checked(vfunc, sample, store, func, *args, **kwargs)
 
-    def decorate(operation_func):
-        @wraps(operation_func)
-        def wrapper(*operation_args, **operation_kwargs):
-            result = operation_func(*operation_args, **operation_kwargs)
-            vfunc(result, func, *args, **kwargs)
-            return result
-        return wrapper
-    return decorate
+
+def is_close_to(df_to_compare, rtol=1e-5, atol=1e-8, n_rows=10, n_jobs=1,
+                sample=None, store=None):
+    """
+    Asserts that the numeric columns are within ``rtol`` / ``atol`` of
+    those of ``df_to_compare``.
+    """
+    return _checked(ck.is_close_to, sample, store, df_to_compare, rtol=rtol,
+                    atol=atol, n_rows=n_rows, n_jobs=n_jobs)
 
 
 def is_same_as(df_to_compare, **assert_kwargs):
-    def decorate(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            result = func(*args, **kwargs)
-            ck.is_same_as(result, df_to_compare, **assert_kwargs)
-            return result
-        return wrapper
-    return decorate
+    sample = assert_kwargs.pop('sample', None)
+    store = assert_kwargs.pop('store', None)
+    return _checked(ck.is_same_as, sample, store, df_to_compare,
+                    **assert_kwargs)
 
 
 __all__ = ['is_monotonic', 'is_same_as', 'is_shape', 'none_missing',
-           'unique_index', 'within_range', 'within_set', 'has_dtypes',
-           'verify', 'verify_all', 'verify_any', 'within_n_std',
-           'one_to_many','is_same_as',]
+           'unique_index', 'within_range', 'within_set', 'has_columns',
+           'has_dtypes', 'verify', 'verify_all', 'verify_any', 'verify_expr',
+           'within_n_std', 'one_to_many', 'is_close_to', 'is_same_as',]
 
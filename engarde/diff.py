@@ -0,0 +1,384 @@
+# -*- coding: utf-8 -*-
+"""
+diff.py
+
+Compact summaries of how two DataFrames differ, computed in blocks of
+rows so that peak memory stays bounded however large the frames.
+
+>>> diff = diff_frames(df, golden)
+>>> diff.counts
+price    12
+qty       1
+Name: differing, dtype: int64
+>>> diff.rows          # the first differing rows, side by side
+
+Columns are matched by name and rows by position. Missing values equal
+each other, and numeric values within ``rtol`` / ``atol`` of each other
+are equal, as in ``math.isclose`` and ``assert_frame_equal``.
+
+``numeric_errors`` measures how far apart the numeric columns of two
+frames are, with ``np.isclose`` tolerances, comparing groups of columns
+as 2d arrays, on a pool of threads for wide frames.
+"""
+from __future__ import (unicode_literals, absolute_import, division)
+
+import numpy as np
+import pandas as pd
+
+
+def _is_numeric(dtype):
+    return isinstance(dtype, np.dtype) and dtype.kind in 'biufc'
+
+
+def _hashes(values):
+    if isinstance(values, np.ndarray):
+        return pd.util.hash_array(values)
+    return pd.util.hash_pandas_object(values, index=False).values
+
+
+def _differ(a, b, rtol, atol):
+    """
+    Where the blocks ``a`` and ``b``, arrays or Series, hold different
+    values, as a boolean array.
+    """
+    if _is_numeric(a.dtype) and _is_numeric(b.dtype):
+        differ = np.asarray(a != b)
+        if 'b' in (a.dtype.kind, b.dtype.kind):
+            return differ
+        # only the values that aren't exactly equal can be close
+        where = np.flatnonzero(differ)
+        a, b = a[where], b[where]
+        if a.dtype.kind not in 'fc':
+            a = a.astype(float)
+        close = np.isnan(a) & np.isnan(b)
+        if rtol or atol:
+            error = np.abs(a - b)
+            scale = rtol * np.maximum(np.abs(a), np.abs(b))
+            close |= np.isfinite(error) & (error <= np.maximum(scale, atol))
+        differ[where[close]] = False
+        return differ
+    if a.dtype == b.dtype:
+        if isinstance(a, np.ndarray) and a.dtype.kind in 'mM':
+            return a.view('i8') != b.view('i8')
+        try:
+            return _hashes(a) != _hashes(b)
+        except TypeError:
+            # unhashable cells, like lists or dicts
+            pass
+    a, b = np.asarray(a, dtype=object), np.asarray(b, dtype=object)
+    return (a != b) & ~(pd.isnull(a) & pd.isnull(b))
+
+
+def _column(df, name):
+    values = df[name]
+    if isinstance(values.values, np.ndarray):
+        return values.values
+    return values
+
+
+class FrameDiff(object):
+    """
+    How two DataFrames differ, see ``diff_frames``.
+
+    Attributes
+    ==========
+    shapes : tuple
+      the shapes of both frames
+    only_left, only_right : list
+      columns in only one of the frames
+    dtypes : dict
+      maps the common columns whose dtypes differ to both dtypes
+    index_differs : bool
+      whether the indexes differ
+    counts : Series
+      number of differing cells in each common column that has any
+    n_rows : int
+      number of rows with any differing cell
+    rows : DataFrame
+      the first differing rows, with a ``left`` and a ``right`` column
+      for each differing column, labeled by the index of the left frame
+    """
+
+    def __init__(self, shapes, only_left, only_right, dtypes, index_differs,
+                 counts, n_rows, rows):
+        self.shapes = shapes
+        self.only_left = only_left
+        self.only_right = only_right
+        self.dtypes = dtypes
+        self.index_differs = index_differs
+        self.counts = counts
+        self.n_rows = n_rows
+        self.rows = rows
+
+    @property
+    def columns(self):
+        """The common columns with differing values."""
+        return list(self.counts.index)
+
+    @property
+    def equal(self):
+        """Whether the frames have the same shape, columns and values."""
+        return (self.shapes[0] == self.shapes[1] and not self.only_left and
+                not self.only_right and not self.index_differs and
+                not len(self.counts))
+
+    def __repr__(self):
+        lines = []
+        if self.shapes[0] != self.shapes[1]:
+            lines.append("shapes differ: {} vs {}".format(*self.shapes))
+        if self.only_left:
+            lines.append("columns only in left: {!r}".format(self.only_left))
+        if self.only_right:
+            lines.append("columns only in right: {!r}".format(
+                self.only_right))
+        for name, (left, right) in self.dtypes.items():
+            lines.append("dtypes of {!r} differ: {} vs {}".format(
+                name, left, right))
+        if self.index_differs:
+            lines.append("indexes differ")
+        if len(self.counts):
+            lines.append("{} rows differ, differing cells per column:".format(
+                self.n_rows))
+            lines.append(self.counts.to_string())
+            lines.append("first differing rows:")
+            lines.append(self.rows.to_string())
+        return '\n'.join(lines) or "no differences"
+
+
+def diff_frames(left, right, rtol=0, atol=0, columns=None, n_rows=10,
+                block_size=2 ** 16, ranges=None):
+    """
+    Summarize how ``left`` and ``right`` differ.
+
+    Parameters
+    ==========
+    left, right : DataFrame or Series
+    rtol, atol : float
+      relative and absolute tolerances of numeric values
+    columns : list, optional
+      the only columns whose values are compared
+    n_rows : int
+      number of differing rows to keep
+    block_size : int
+      number of rows compared at a time; memory used is proportional to
+      it, and to ``n_rows``
+    ranges : list, optional
+      sorted, non-overlapping ``(start, stop)`` row positions, the only
+      rows whose values are compared, e.g. the blocks found by
+      ``engarde.generic.differing_blocks``
+
+    Returns
+    =======
+    diff : FrameDiff
+
+    Notes
+    =====
+    Rows beyond the length of the shorter frame aren't compared, but
+    show in ``FrameDiff.shapes``. Neither are columns whose name isn't
+    unique in either frame.
+    """
+    if isinstance(left, pd.Series):
+        left = left.to_frame()
+    if isinstance(right, pd.Series):
+        right = right.to_frame()
+    in_right = set(right.columns)
+    in_left = set(left.columns)
+    duplicated = (set(left.columns[left.columns.duplicated()]) |
+                  set(right.columns[right.columns.duplicated()]))
+    common = [c for c in left.columns.unique()
+              if c in in_right and c not in duplicated]
+    only_left = [c for c in left.columns if c not in in_right]
+    only_right = [c for c in right.columns if c not in in_left]
+    dtypes = {c: (left[c].dtype, right[c].dtype) for c in common
+              if left[c].dtype != right[c].dtype}
+    length = min(len(left), len(right))
+    index_differs = not left.index.equals(right.index)
+
+    if columns is not None:
+        columns = set(columns)
+        common = [c for c in common if c in columns]
+    pairs = [(c, _column(left, c), _column(right, c)) for c in common]
+    counts = dict.fromkeys(common, 0)
+    # the first ``n_rows`` differing positions of each column; together
+    # they hold the first ``n_rows`` differing rows
+    first = {}
+    total = 0
+    if ranges is None:
+        ranges = [(0, length)]
+    blocks = [(start, min(start + block_size, stop, length))
+              for lo, stop in ranges
+              for start in range(lo, min(stop, length), block_size)]
+    for start, stop in blocks:
+        any_differ = np.zeros(stop - start, dtype=bool)
+        for name, a, b in pairs:
+            if isinstance(a, pd.Series):
+                a = a.iloc[start:stop]
+            else:
+                a = a[start:stop]
+            if isinstance(b, pd.Series):
+                b = b.iloc[start:stop]
+            else:
+                b = b[start:stop]
+            differ = np.asarray(_differ(a, b, rtol, atol), dtype=bool)
+            count = int(differ.sum())
+            if not count:
+                continue
+            counts[name] += count
+            any_differ |= differ
+            kept = first.setdefault(name, [])
+            if len(kept) < n_rows:
+                positions = np.flatnonzero(differ)[:n_rows - len(kept)]
+                kept.extend(start + positions)
+        total += int(any_differ.sum())
+
+    counts = pd.Series([counts[c] for c in common if counts[c]],
+                       index=[c for c in common if counts[c]],
+                       name='differing', dtype='int64')
+    positions = sorted(set(p for kept in first.values() for p in kept))
+    positions = positions[:n_rows]
+    rows = _side_by_side(left, right, positions, list(counts.index))
+    return FrameDiff((left.shape, right.shape), only_left, only_right, dtypes,
+                     index_differs, counts, total, rows)
+
+
+def _side_by_side(left, right, positions, columns):
+    """
+    The rows at ``positions`` of ``columns``, with a ``left`` and a
+    ``right`` column for each, labeled by the index of ``left``.
+    """
+    sides = [left.iloc[positions], right.iloc[positions]]
+    # tuples stay whole, as the names of MultiIndex columns
+    names = pd.Index(columns, dtype=object, tupleize_cols=False)
+    keys = pd.MultiIndex.from_arrays([names.repeat(2),
+                                      ['left', 'right'] * len(names)])
+    if not len(keys):
+        return pd.DataFrame(index=sides[0].index, columns=keys)
+    rows = pd.concat([side[name].reset_index(drop=True)
+                      for name in columns for side in sides], axis=1)
+    rows.columns = keys
+    rows.index = sides[0].index
+    return rows
+
+
+# number of columns compared at once by ``numeric_errors``, bounding the
+# size of the temporaries
+GROUP_SIZE = 16
+
+
+def _group_errors(left, right, columns, rtol, atol):
+    """
+    The errors of ``columns``, compared as 2d float arrays: the maximum
+    absolute and relative error and the number of values that aren't
+    close in each, and the rows holding values that aren't close along
+    with the largest absolute error of those in each.
+    """
+    # nullable dtypes hold pd.NA, which only converts given a stand-in
+    a = left[columns].to_numpy(dtype=float, na_value=np.nan)
+    b = right[columns].to_numpy(dtype=float, na_value=np.nan)
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        error = np.subtract(a, b)
+        np.abs(error, out=error)
+        scale = np.abs(b)
+        tolerance = scale * rtol
+        tolerance += atol
+        # NaN errors, from missing values or infinities, compare False
+        bad = error <= tolerance
+        np.logical_not(bad, out=bad)
+        bad |= error == np.inf
+        del tolerance
+        rows = cols = np.empty(0, dtype=int)
+        if bad.any():
+            rows, cols = np.nonzero(bad)
+            # equal values, including infinities, and values missing in the
+            # same place are exact; a value missing on one side is not
+            x, y = a[rows, cols], b[rows, cols]
+            exact = (x == y) | (np.isnan(x) & np.isnan(y))
+            error[rows[exact], cols[exact]] = 0
+            bad[rows[exact], cols[exact]] = False
+            rows, cols = rows[~exact], cols[~exact]
+            missing = np.isnan(error[rows, cols])
+            error[rows[missing], cols[missing]] = np.inf
+        relative = np.divide(error, scale, out=scale)
+    abs_error = error.max(axis=0)
+    # 0 / 0 and inf / inf are NaN, which fmax skips
+    rel_error = np.fmax.reduce(relative, axis=0)
+    rel_error[np.isnan(rel_error)] = 0
+    rel_error[abs_error == np.inf] = np.inf
+    not_close = np.bincount(cols, minlength=len(columns))
+    worst = np.unique(rows)
+    largest = np.where(bad[worst], error[worst], -1).max(axis=1)
+    return abs_error, rel_error, not_close, (worst, largest)
+
+
+def numeric_errors(left, right, rtol=1e-5, atol=1e-8, n_rows=10, n_jobs=1):
+    """
+    How far the numeric columns of ``left`` are from those of ``right``.
+
+    Values are close when ``|left - right| <= atol + rtol * |right|``,
+    as in ``np.isclose``, or when both are missing. Rows are matched by
+    position; ``right`` needs at least the numeric columns of ``left``.
+
+    Parameters
+    ==========
+    left, right : DataFrame
+    rtol, atol : float
+      relative and absolute tolerances
+    n_rows : int
+      number of worst rows to keep
+    n_jobs : int, optional
+      number of threads comparing groups of columns; None or less than
+      one means one per CPU
+
+    Returns
+    =======
+    errors : DataFrame
+      the maximum absolute and relative error (``max_abs_error``,
+      ``max_rel_error``) and the number of values that aren't close
+      (``not_close``) of each numeric column
+    worst : DataFrame
+      the rows holding the largest absolute errors among the values that
+      aren't close, side by side for the columns with any
+    """
+    columns = [c for c, dtype in left.dtypes.items()
+               if pd.api.types.is_numeric_dtype(dtype)]
+    groups = [columns[i:i + GROUP_SIZE]
+              for i in range(0, len(columns), GROUP_SIZE)]
+
+    def compare(group):
+        return _group_errors(left, right, group, rtol, atol)
+
+    if n_jobs == 1 or len(groups) < 2:
+        results = [compare(group) for group in groups]
+    else:
+        from multiprocessing.pool import ThreadPool
+        from engarde.parallel import _n_jobs
+        pool = ThreadPool(min(_n_jobs(n_jobs), len(groups)))
+        try:
+            results = pool.map(compare, groups)
+        finally:
+            pool.close()
+            pool.join()
+
+    empty = np.empty(0)
+    abs_error, rel_error, not_close = (
+        np.concatenate([empty] + [result[i] for result in results])
+        for i in range(3))
+    errors = pd.DataFrame({'max_abs_error': abs_error,
+                           'max_rel_error': rel_error,
+                           'not_close': not_close.astype('int64')},
+                          index=pd.Index(columns, dtype=object))
+
+    worst = np.full(min(len(left), len(right)), -1.)
+    for result in results:
+        rows, largest = result[3]
+        worst[rows] = np.maximum(worst[rows], largest)
+    positions = np.flatnonzero(worst >= 0)
+    if len(positions) > n_rows:
+        top = np.argpartition(-worst[positions], n_rows - 1)[:n_rows]
+        positions = positions[top]
+    positions = positions[np.argsort(-worst[positions], kind='stable')]
+    failing = list(errors.index[errors['not_close'] > 0])
+    return errors, _side_by_side(left, right, positions, failing)
+
+
+__all__ = ['diff_frames', 'FrameDiff', 'numeric_errors']
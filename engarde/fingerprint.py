@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+fingerprint.py
+
+Content fingerprints of DataFrames, stable across processes and runs,
+to recognize data that was already validated.
+
+>>> fingerprint(df)
+'5c1b0f...'
+
+Each column is hashed row by row with ``pd.util.hash_pandas_object``,
+and the row hashes are digested along with the column's name and
+dtype. The column digests, the index's and the shape are combined into
+the fingerprint. Columns are hashed independently, so wide frames can
+be hashed on a pool of threads.
+
+Two frames with the same fingerprint have the same index, columns,
+dtypes and values, up to hash collisions. Column names are told apart
+by type as well as value, categoricals by their categories and their
+order, and the values of object columns by their types, so ``1`` and
+``'1'`` differ.
+"""
+from __future__ import (unicode_literals, absolute_import, division)
+
+import hashlib
+from multiprocessing.pool import ThreadPool
+
+import numpy as np
+import pandas as pd
+
+from engarde.parallel import _n_jobs
+
+
+def _type_name(obj):
+    return '{}.{}'.format(type(obj).__module__, type(obj).__name__)
+
+
+def _digest(values, name=None):
+    """SHA-1 of the row hashes of ``values``, a Series or an Index."""
+    digest = hashlib.sha1()
+    # the type tells the column 1 from the column '1'
+    digest.update('{}\0{!r}\0{}\0'.format(_type_name(name), name,
+                                          values.dtype).encode('utf-8'))
+    hashes = pd.util.hash_pandas_object(values, index=False).values
+    digest.update(hashes.tobytes())
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        # the row hashes only depend on the categories used, in any order
+        digest.update(repr(dtype.ordered).encode('utf-8'))
+        digest.update(_digest(pd.Series(dtype.categories)))
+    elif dtype == object:
+        # objects hash by their string form, which 1 and '1' share
+        array = np.asarray(values)
+        if pd.api.types.infer_dtype(array, skipna=False) != 'string':
+            codes, types = pd.factorize(
+                np.fromiter(map(type, array), dtype=object, count=len(array)))
+            digest.update(codes.astype('int64').tobytes())
+            digest.update('\0'.join('{}.{}'.format(t.__module__, t.__name__)
+                                    for t in types).encode('utf-8'))
+    return digest.digest()
+
+
+def column_fingerprints(df, n_jobs=1):
+    """
+    The fingerprint of each column of ``df``, as raw bytes.
+
+    Parameters
+    ==========
+    df : DataFrame
+    n_jobs : int, optional
+      number of threads to hash the columns on; None or less than one
+      means one per CPU
+
+    Returns
+    =======
+    digests : list of bytes
+      in the order of the columns
+    """
+    columns = [(df.iloc[:, i], name) for i, name in enumerate(df.columns)]
+    n_jobs = _n_jobs(n_jobs)
+    if n_jobs == 1 or len(columns) < 2:
+        return [_digest(values, name) for values, name in columns]
+    pool = ThreadPool(min(n_jobs, len(columns)))
+    try:
+        return pool.map(lambda c: _digest(*c), columns)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def fingerprint(df, index=True, n_jobs=1):
+    """
+    A hex digest of the contents of ``df``.
+
+    Parameters
+    ==========
+    df : DataFrame
+    index : bool
+      whether the index is part of the fingerprint
+    n_jobs : int, optional
+      number of threads to hash the columns on; None or less than one
+      means one per CPU
+
+    Returns
+    =======
+    fingerprint : str
+    """
+    digest = hashlib.sha1()
+    digest.update(repr(df.shape).encode('utf-8'))
+    if index:
+        digest.update(_digest(df.index, df.index.names))
+    for column in column_fingerprints(df, n_jobs):
+        digest.update(column)
+    return digest.hexdigest()
+
+
+__all__ = ['fingerprint', 'column_fingerprints']
@@ -2,10 +2,14 @@
 """
 Module for useful generic functions.
 """
-from itertools import chain, cycle
+import ast
+from collections import OrderedDict
 
 import numpy as np
 import pandas as pd
+import six
+
+from engarde.config import options
 
 
 # --------------
@@ -65,16 +69,350 @@ def verify_any(df, check, *args, **kwargs):
         raise
     return df
 
+def verify_expr(df, *exprs):
+    """
+    Verify that the boolean expressions ``exprs`` are true for every row.
+
+    Expressions use the syntax of ``DataFrame.eval``, where ``&`` and
+    ``|`` bind looser than comparisons, e.g. ``'price1 >= 0 & time1 <
+    600'``. With numexpr installed, and columns it can handle, they're
+    all evaluated in a single multithreaded pass over blocks of the
+    columns, without a temporary per operation. Otherwise they're
+    evaluated with ``DataFrame.eval``.
+    """
+    if not exprs:
+        return df
+    if np.all(_evaluate(df, exprs)):
+        return df
+    # find the culprit
+    for expr in exprs:
+        result = _evaluate(df, [expr])
+        if not np.all(result):
+            raise AssertionError("{} not true for all".format(expr),
+                                 df[~result])
+    return df
+
+# ------------------
+# Expression helpers
+# ------------------
+
+_NUMEXPR_OPS = {
+    ast.Add: '+', ast.Sub: '-', ast.Mult: '*', ast.Div: '/', ast.Mod: '%',
+    ast.Pow: '**', ast.BitAnd: '&', ast.BitOr: '|', ast.And: '&',
+    ast.Or: '|', ast.Eq: '==', ast.NotEq: '!=', ast.Lt: '<', ast.LtE: '<=',
+    ast.Gt: '>', ast.GtE: '>=', ast.USub: '-', ast.Invert: '~',
+    ast.Not: '~',
+}
+
+# translations of the most recently used expressions, see _to_numexpr
+_TRANSLATED = OrderedDict()
+_TRANSLATED_SIZE = 1024
+
+
+def _evaluate(df, exprs):
+    """
+    The conjunction of ``exprs`` on ``df``, as a boolean array or Series.
+    """
+    try:
+        import numexpr
+    except ImportError:
+        numexpr = None
+    translated = [_translated(expr) for expr in exprs]
+    if numexpr is not None and all(translated):
+        names = set().union(*(names for _, names in translated))
+        if names.issubset(df.columns):
+            arrays = {name: df[name].values for name in names}
+            if all(isinstance(a, np.ndarray) and a.dtype.kind in 'biufc'
+                   for a in arrays.values()):
+                source = ' & '.join(source for source, _ in translated)
+                try:
+                    return numexpr.evaluate(source, local_dict=arrays)
+                except (NotImplementedError, TypeError, ValueError):
+                    # e.g. bitwise operations on integers
+                    pass
+    return df.eval(' & '.join('({})'.format(expr) for expr in exprs))
+
+
+def _translated(expr):
+    """
+    ``_translate(expr)``, remembered for the most recently used
+    expressions only: those built on the fly, e.g. with thresholds
+    formatted in, would otherwise pile up.
+    """
+    try:
+        result = _TRANSLATED.pop(expr)
+    except KeyError:
+        result = _translate(expr)
+    _TRANSLATED[expr] = result
+    while len(_TRANSLATED) > _TRANSLATED_SIZE:
+        try:
+            _TRANSLATED.popitem(last=False)
+        except KeyError:
+            # emptied by another thread
+            break
+    return result
+
+
+def _translate(expr):
+    """
+    ``expr`` as fully parenthesized numexpr source and the names it
+    uses, or None if it can't be translated.
+    """
+    if '"' in expr or "'" in expr or '`' in expr or '@' in expr:
+        result = None
+    else:
+        # like pandas, parse & and | with the precedence of and and or
+        source = expr.replace('&', ' and ').replace('|', ' or ')
+        names = set()
+        try:
+            result = _to_numexpr(ast.parse(source.strip(), mode='eval').body,
+                                 names), frozenset(names)
+        except (SyntaxError, ValueError, KeyError):
+            result = None
+    return result
+
+
+def _to_numexpr(node, names):
+    if isinstance(node, ast.BoolOp):
+        op = ' {} '.format(_NUMEXPR_OPS[type(node.op)])
+        return '({})'.format(op.join(_to_numexpr(v, names)
+                                     for v in node.values))
+    if isinstance(node, ast.BinOp):
+        return '({} {} {})'.format(_to_numexpr(node.left, names),
+                                   _NUMEXPR_OPS[type(node.op)],
+                                   _to_numexpr(node.right, names))
+    if isinstance(node, ast.UnaryOp):
+        return '({}{})'.format(_NUMEXPR_OPS[type(node.op)],
+                               _to_numexpr(node.operand, names))
+    if isinstance(node, ast.Compare):
+        # a < b < c is (a < b) & (b < c)
+        operands = [node.left] + node.comparators
+        return '({})'.format(' & '.join(
+            '({} {} {})'.format(_to_numexpr(left, names),
+                                _NUMEXPR_OPS[type(op)],
+                                _to_numexpr(right, names))
+            for left, op, right in zip(operands, node.ops, operands[1:])))
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+        if node.keywords:
+            raise ValueError("Keyword arguments aren't supported")
+        return '{}({})'.format(node.func.id, ', '.join(
+            _to_numexpr(arg, names) for arg in node.args))
+    if isinstance(node, ast.Name):
+        if node.id in ('True', 'False'):
+            return node.id
+        names.add(node.id)
+        return node.id
+    if isinstance(node, getattr(ast, 'Constant', None) or ast.Num):
+        value = getattr(node, 'value', getattr(node, 'n', None))
+        if isinstance(value, (bool, int, float)):
+            return repr(value)
+    raise ValueError("Can't translate {}".format(type(node).__name__))
+
+# -------
+# Helpers
+# -------
+
+def has_missing(s):
+    """
+    Whether the Series ``s`` has any missing values.
+
+    Integer and boolean columns can't hold NaN and are skipped outright.
+    Float columns are reduced with ``min``, which propagates NaN, so no
+    null mask is built. Other dtypes fall back to ``isnull``. A
+    DataFrame, the columns sharing a duplicated label, has missing values
+    if any of its columns does.
+    """
+    if isinstance(s, pd.DataFrame):
+        return any(has_missing(s.iloc[:, i]) for i in range(s.shape[1]))
+    dtype = s.dtype
+    if isinstance(dtype, np.dtype):
+        if dtype.kind in 'biu':
+            return False
+        if dtype.kind == 'f':
+            values = s.values
+            return values.size > 0 and bool(np.isnan(values.min()))
+    return bool(s.isnull().any())
+
+class ValueSet(object):
+    """
+    A set of allowed values, compiled once for fast membership tests.
+
+    Categorical columns are tested once per category, then mapped
+    through their codes. Large sets keep the hash table of a
+    ``pd.Index``, built on first use and reused by every later test;
+    small ones are cheaper to hash afresh with ``isin``. As with
+    ``Series.isin``, NaN matches NaN.
+
+    Parameters
+    ==========
+    values : array-like
+    """
+
+    # sets at least this big reuse their hash table
+    large = 100000
+
+    def __init__(self, values):
+        if isinstance(values, (six.string_types, bytes)):
+            raise TypeError("allowed values must be a collection, not a "
+                            "string: {!r}".format(values))
+        values = pd.unique(pd.Series(list(values), dtype=object)
+                           .infer_objects())
+        self.has_nan = bool(pd.isnull(values).any())
+        self.index = pd.Index(values[pd.notnull(values)])
+
+    @classmethod
+    def of(cls, values):
+        """``values`` if it already is a ValueSet, else a new one."""
+        return values if isinstance(values, cls) else cls(values)
+
+    def __len__(self):
+        return len(self.index) + self.has_nan
+
+    def __iter__(self):
+        return iter(list(self.index) + ([np.nan] if self.has_nan else []))
+
+    def __repr__(self):
+        return 'ValueSet({!r})'.format(list(self))
+
+    def contains(self, s):
+        """
+        Boolean array, True where the Series ``s`` is in the set.
+        """
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            ok = self.contains(pd.Series(s.cat.categories))
+            # code -1, for missing values, picks the last entry
+            ok = np.append(ok, self.has_nan)
+            return ok[s.cat.codes.values]
+        if len(self.index) >= self.large:
+            found = self.index.get_indexer(s) >= 0
+        else:
+            found = s.isin(self.index).values
+        if self.has_nan:
+            found |= pd.isnull(s.values)
+        return found
+
 # ---------------
 # Error reporting
 # ---------------
 
-def bad_locations(df):
-    columns = df.columns
-    all_locs = chain.from_iterable(zip(df.index, cycle([col])) for col in columns)
-    bad = pd.Series(list(all_locs))[np.asarray(df).ravel(1)]
-    msg = bad.values
-    return msg
+def bad_locations(df, limit=None):
+    """
+    Locations of the True values in a boolean DataFrame.
+
+    Only the failing cells are materialized, so the cost of the report
+    is proportional to the number of failures rather than the size of
+    the frame.
+
+    Parameters
+    ==========
+    df : DataFrame of bool
+    limit : int, optional
+        report at most the first ``limit`` locations. Defaults to the
+        ``report_limit`` option. When the report is truncated the last
+        entry says how many locations were left out.
+
+    Returns
+    =======
+    locations : ndarray
+        ``(index, column)`` tuples, column by column.
+    """
+    if limit is None:
+        limit = options['report_limit']
+    # transposed, so that the locations come out column by column
+    cols, rows = np.nonzero(np.asarray(df, dtype=bool).T)
+    total = len(rows)
+    if limit is not None and total > limit:
+        cols, rows = cols[:limit], rows[:limit]
+    locs = list(zip(df.index[rows], df.columns[cols]))
+    if len(locs) < total:
+        locs.append('... {} more ({} total)'.format(total - len(locs), total))
+    return pd.Series(locs, dtype=object).values
+
+def _same_structure(left, right):
+    """
+    Whether two frames have identical columns, index and dtypes, so
+    that they're equal iff their values are.
+    """
+    if not (isinstance(left, pd.DataFrame) and
+            isinstance(right, pd.DataFrame)):
+        return False
+    if left.shape != right.shape:
+        return False
+    for a, b in [(left.columns, right.columns), (left.index, right.index)]:
+        if not (type(a) is type(b) and a.names == b.names and a.equals(b)
+                and getattr(a, 'freq', None) == getattr(b, 'freq', None)):
+            return False
+    flags = [getattr(getattr(df, 'flags', None), 'allows_duplicate_labels',
+                     None) for df in (left, right)]
+    return flags[0] == flags[1] and left.dtypes.equals(right.dtypes)
+
+
+def _blocks_equal(a, b, starts, size):
+    """
+    For each block of ``size`` rows starting at ``starts``, whether the
+    Series ``a`` and ``b`` hold the same values there.
+    """
+    if (isinstance(a.values, np.ndarray) and a.dtype.kind in 'biufcmM'
+            and a.dtype.itemsize in (1, 2, 4, 8)):
+        a, b = a.values, b.values
+        if (a.__array_interface__['data'] == b.__array_interface__['data']
+                and a.strides == b.strides):
+            return [True] * len(starts)
+        # compare the raw bytes, so that NaNs in the same place are equal
+        unsigned = np.dtype('u{}'.format(a.dtype.itemsize))
+        a, b = a.view(unsigned), b.view(unsigned)
+        return [np.array_equal(a[i:i + size], b[i:i + size])
+                for i in starts]
+    return [_block_equal(a.iloc[i:i + size], b.iloc[i:i + size])
+            for i in starts]
+
+
+def _block_equal(a, b):
+    try:
+        return np.array_equal(pd.util.hash_pandas_object(a, index=False).values,
+                              pd.util.hash_pandas_object(b, index=False).values)
+    except TypeError:
+        # unhashable cells, like lists or dicts
+        return a.equals(b)
+
+
+def differing_blocks(left, right, block_size=2 ** 20):
+    """
+    Where two frames with the same structure hold different values.
+
+    Numeric, boolean and datetime columns are compared block by block
+    on their raw bytes; others by their ``pd.util.hash_pandas_object``
+    row hashes, or with ``Series.equals`` if their values can't be
+    hashed. Memory stays proportional to ``block_size``.
+
+    Parameters
+    ==========
+    left, right : DataFrame
+    block_size : int
+      number of rows compared at a time
+
+    Returns
+    =======
+    blocks : list or None
+      ``(column position, first row, last row + 1)`` of every block of
+      rows whose values may differ, or None when the frames' columns,
+      index or dtypes differ. Blocks absent from the list are equal;
+      those in it can still be equal up to representation, e.g. ``0.``
+      and ``-0.``, or to a tolerance.
+    """
+    if not _same_structure(left, right):
+        return None
+    n = len(left)
+    starts = range(0, n, block_size)
+    blocks = []
+    for j in range(left.shape[1]):
+        equal = _blocks_equal(left.iloc[:, j], right.iloc[:, j], starts,
+                              block_size)
+        blocks.extend((j, i, min(i + block_size, n))
+                      for i, same in zip(starts, equal) if not same)
+    return blocks
+
 
-__all__ = ['verify', 'verify_all', 'verify_any', 'bad_locations']
+__all__ = ['verify', 'verify_all', 'verify_any', 'verify_expr', 'has_missing',
+           'ValueSet', 'bad_locations', 'differing_blocks']
 
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+instrument.py
+
+Timing of every check run through a ``CheckPlan``, which includes all
+the decorators.
+
+Each check invocation produces a ``Record`` and hands it to every
+registered sink. A sink is any callable taking a ``Record``; engarde
+provides an in-memory ``Collector`` and a ``LoggingSink``. With no sinks
+registered, instrumentation costs a single truthiness test per check.
+
+>>> with recording() as records:
+...     run_pipeline()
+>>> records.report()  # time spent per decorated function and check
+
+Checks run with ``engine='processes'`` are timed in the worker
+processes, and their records don't reach the sinks.
+"""
+from __future__ import (unicode_literals, absolute_import, division)
+
+from collections import namedtuple
+from contextlib import contextmanager
+import logging
+import timeit
+
+import pandas as pd
+
+timer = timeit.default_timer
+
+# registered sinks; see ``add_sink``
+sinks = []
+
+
+class Record(namedtuple('Record', ['label', 'check', 'seconds', 'rows',
+                                   'columns', 'passed'])):
+    """
+    A single check invocation.
+
+    Attributes
+    ==========
+    label : str or None
+      the decorated function, as ``module.name``, if any
+    check : str
+      name of the check
+    seconds : float
+      wall time
+    rows, columns : int
+      shape of the frame checked, after any sampling
+    passed : bool
+    """
+    __slots__ = ()
+
+
+def add_sink(sink):
+    """
+    Register ``sink``, a callable taking a ``Record``.
+    """
+    sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink):
+    sinks.remove(sink)
+
+
+def emit(record):
+    for sink in sinks:
+        sink(record)
+
+
+class Collector(object):
+    """
+    Sink keeping the records in memory.
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, record):
+        self.records.append(record)
+
+    def __len__(self):
+        return len(self.records)
+
+    def clear(self):
+        del self.records[:]
+
+    def report(self):
+        return report(self.records)
+
+
+class LoggingSink(object):
+    """
+    Sink logging each record.
+
+    Parameters
+    ==========
+    logger : logging.Logger, optional
+      defaults to the ``engarde`` logger
+    level : int
+      level to log passing checks at; failures log at WARNING
+    """
+
+    def __init__(self, logger=None, level=logging.DEBUG):
+        self.logger = logger or logging.getLogger('engarde')
+        self.level = level
+
+    def __call__(self, record):
+        level = self.level if record.passed else logging.WARNING
+        self.logger.log(level, "%s %s on %dx%d %s in %.6fs",
+                        record.label or '-', record.check, record.rows,
+                        record.columns, 'passed' if record.passed
+                        else 'failed', record.seconds)
+
+
+@contextmanager
+def recording():
+    """
+    Collect the records of every check run within the block.
+    """
+    collector = add_sink(Collector())
+    try:
+        yield collector
+    finally:
+        remove_sink(collector)
+
+
+def report(records):
+    """
+    Summarize records per decorated function and check, most expensive
+    first.
+
+    Parameters
+    ==========
+    records : iterable of Record
+
+    Returns
+    =======
+    summary : DataFrame
+      indexed by (label, check), with the number of ``calls`` and
+      ``failures``, the ``rows`` checked, and the ``total``, ``mean``
+      and ``max`` seconds spent
+    """
+    df = pd.DataFrame.from_records(list(records), columns=Record._fields)
+    df['label'] = df['label'].fillna('-')
+    df['failed'] = ~df['passed'].astype(bool)
+    grouped = df.groupby(['label', 'check'])
+    summary = pd.DataFrame({
+        'calls': grouped['seconds'].count(),
+        'failures': grouped['failed'].sum().astype(int),
+        'rows': grouped['rows'].sum(),
+        'total': grouped['seconds'].sum(),
+        'mean': grouped['seconds'].mean(),
+        'max': grouped['seconds'].max(),
+    }, columns=['calls', 'failures', 'rows', 'total', 'mean', 'max'])
+    return summary.sort_values('total', ascending=False)
+
+
+__all__ = ['Record', 'Collector', 'LoggingSink', 'add_sink', 'remove_sink',
+           'recording', 'report']
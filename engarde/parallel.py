@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+parallel.py
+
+Run a ``CheckPlan`` across a pool of threads or processes.
+
+Column-local checks (``none_missing``, ``unique``, ``within_range``,
+``within_set``, ``is_monotonic``) are split into one piece per column,
+and the columns are spread over the workers. Row-local checks
+(``none_missing``, ``within_range``, ``within_set``) touching fewer
+columns than there are workers are split into row blocks instead. Every
+other check runs unsplit in the calling thread while the pool works.
+
+Most of the pandas and NumPy kernels behind the checks release the GIL,
+so ``engine='threads'`` scales well and avoids copying the data.
+``engine='processes'`` pickles each worker's columns or rows across.
+
+When checks fail, the error of the first failing check in plan order is
+raised, with the failure locations of all its pieces merged together:
+the same error the check raises when run serially.
+
+Steps with a ``ResultStore`` are looked up and recorded in the calling
+process, against the whole frame; the pieces sent to the workers don't
+carry the store.
+"""
+from __future__ import (unicode_literals, absolute_import, division)
+
+from collections import OrderedDict
+from itertools import chain
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+
+import numpy as np
+import pandas as pd
+
+import engarde.checks as ck
+from engarde.plan import FrameStats, Step
+
+
+# ---------
+# Splitting
+# ---------
+# Each splitter takes the DataFrame and the arguments of its check, and
+# returns a list of (column, kwargs) pieces, each checking one column.
+
+def _split_columns(df, columns=None):
+    if columns is None:
+        columns = df.columns
+    return [(col, {'columns': [col]}) for col in columns]
+
+
+def _split_items(df, items=None):
+    return [(k, {'items': {k: v}}) for k, v in items.items()]
+
+
+def _split_monotonic(df, items=None, increasing=None, strict=False):
+    if items is None:
+        items = {k: (increasing, strict) for k in df}
+    return _split_items(df, items)
+
+
+# check -> (splitter, whether the check is row-local)
+_SPLITTERS = {
+    ck.none_missing: (_split_columns, True),
+    ck.unique: (_split_columns, False),
+    ck.within_range: (_split_items, True),
+    ck.within_set: (_split_items, True),
+    ck.is_monotonic: (_split_monotonic, False),
+}
+
+# row-local checks that stop at their first failing column and report it
+# as a Series -> whether that Series covers every row, as a mask, rather
+# than just the failing rows
+_FIRST_FAILING = {
+    ck.within_range: True,
+    ck.within_set: False,
+}
+
+ENGINES = ('threads', 'processes')
+
+
+def _n_jobs(n_jobs):
+    if n_jobs is None or n_jobs < 1:
+        return multiprocessing.cpu_count()
+    return n_jobs
+
+
+def _row_blocks(n_rows, n_blocks):
+    edges = np.linspace(0, n_rows, n_blocks + 1).astype(int)
+    return [slice(a, b) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+
+def _run_task(task, stats=None):
+    """
+    Run ``[(key, step), ...]`` against ``df``, collecting the failures.
+    """
+    df, steps = task
+    if stats is None:
+        stats = FrameStats(df)
+    failures = []
+    for key, step in steps:
+        try:
+            step.run(df, stats)
+        except AssertionError as e:
+            failures.append((key, e))
+    return failures
+
+
+def _merge(errors, axis):
+    """
+    Merge the errors raised by the pieces of a single check.
+    """
+    if len(errors) == 1:
+        return errors[0]
+    args = [e.args for e in errors]
+    msg = args[0][0] if args[0] else None
+    if all(len(a) == 2 and a[0] == msg and
+           isinstance(a[1], (pd.Series, pd.DataFrame)) for a in args):
+        return AssertionError(msg, pd.concat([a[1] for a in args],
+                                             axis=axis))
+    return AssertionError(*chain.from_iterable(args))
+
+
+def _merge_rows(errors, step, df, blocks):
+    """
+    Merge the errors raised by the row blocks of a single check, keyed by
+    block number, into the error the check raises on all of ``df``.
+    """
+    if step.check not in _FIRST_FAILING or not all(
+            len(e.args) == 2 and isinstance(e.args[1], pd.Series)
+            for e in errors.values()):
+        return _merge([errors[j] for j in sorted(errors)], axis=0)
+    # the check on the whole frame fails on the earliest column any
+    # block fails on; the blocks failing on later columns pass on it
+    order = [col for col, _ in _split_items(df, *step.args, **step.kwargs)]
+    first = min((e.args[1].name for e in errors.values()), key=order.index)
+    errors = dict((j, e) for j, e in errors.items()
+                  if e.args[1].name == first)
+    msg = next(iter(errors.values())).args[0]
+    if _FIRST_FAILING[step.check]:
+        parts = [errors[j].args[1] if j in errors else
+                 pd.Series(False, index=df.index[rows], name=first)
+                 for j, rows in enumerate(blocks)]
+    else:
+        parts = [errors[j].args[1] for j in sorted(errors)]
+    return AssertionError(msg, pd.concat(parts))
+
+
+def _make_pool(engine, n_jobs):
+    if engine == 'threads':
+        return ThreadPool(n_jobs)
+    elif engine == 'processes':
+        return multiprocessing.Pool(n_jobs)
+    raise ValueError("engine must be one of {}, got {!r}".format(ENGINES,
+                                                                engine))
+
+
+def validate(df, plan, engine='threads', n_jobs=None):
+    """
+    Run every check in ``plan`` against ``df`` on a pool of workers.
+
+    Parameters
+    ==========
+    df : DataFrame
+    plan : CheckPlan
+    engine : {'threads', 'processes'}
+    n_jobs : int, optional
+      number of workers, defaults to the number of CPUs
+
+    Returns
+    =======
+    df : DataFrame
+      same as the input
+    """
+    n_jobs = _n_jobs(n_jobs)
+    stats = FrameStats(df)
+    # step number -> (store, key) of the steps whose outcome gets recorded
+    stored = {}
+    # pieces are keyed (step number, axis, piece number); the axis is the
+    # one the pieces' failure reports get concatenated along
+    by_column = OrderedDict()
+    by_rows = []
+    serial = []
+    for i, step in enumerate(plan.steps):
+        if step.store is not None:
+            key = step.store.key(step, stats.fingerprint())
+            if key is not None:
+                if step.store.passed(key):
+                    continue
+                stored[i] = step.store, key
+            step = Step(step.check, step.args, step.kwargs,
+                        sample=step.sample, label=step.label)
+        try:
+            split, row_local = _SPLITTERS[step.check]
+        except KeyError:
+            serial.append(((i, 0, 0), step))
+            continue
+        pieces = split(df, *step.args, **step.kwargs)
+        if row_local and len(pieces) < n_jobs:
+            by_rows.append((i, step))
+            continue
+        for j, (col, kwargs) in enumerate(pieces):
+            piece = ((i, 1, j), Step(step.check, kwargs=kwargs,
+                                     sample=step.sample, label=step.label))
+            by_column.setdefault(col, []).append(piece)
+
+    tasks = []
+    columns = list(by_column)
+    for group in np.array_split(np.arange(len(columns)), n_jobs):
+        if not len(group):
+            continue
+        group = [columns[g] for g in group]
+        steps = sorted(chain.from_iterable(by_column[c] for c in group),
+                       key=lambda piece: piece[0])
+        frame = df[group] if engine == 'processes' else df
+        tasks.append((frame, steps))
+    blocks = _row_blocks(len(df), n_jobs) if by_rows else []
+    for j, rows in enumerate(blocks):
+        tasks.append((df.iloc[rows],
+                      [((i, 0, j), step) for i, step in by_rows]))
+
+    pool = _make_pool(engine, n_jobs)
+    try:
+        pending = pool.map_async(_run_task, tasks)
+        failures = _run_task((df, serial), stats)
+        failures.extend(chain.from_iterable(pending.get()))
+    finally:
+        pool.close()
+        pool.join()
+
+    # step number -> the errors of its pieces, in plan order
+    failures.sort(key=lambda failure: failure[0])
+    pieces = OrderedDict()
+    for key, e in failures:
+        pieces.setdefault(key[0], []).append((key, e))
+    row_steps = dict(by_rows)
+    errors = OrderedDict()
+    for i, failed in pieces.items():
+        if i in row_steps:
+            errors[i] = _merge_rows(dict((key[2], e) for key, e in failed),
+                                    row_steps[i], df, blocks)
+        else:
+            errors[i] = _merge([e for _, e in failed], axis=failed[0][0][1])
+    for i, (store, key) in stored.items():
+        store.record(key, errors.get(i))
+    if errors:
+        raise next(iter(errors.values()))
+    return df
+
+
+__all__ = ['validate']
@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+"""
+plan.py
+
+Fused execution of several checks against one DataFrame.
+
+A ``CheckPlan`` collects checks from ``engarde.checks`` and runs them
+together. Intermediate results (column lookups, null masks, min / max,
+set membership) are computed once per column and shared between all the
+checks in the plan, so stacking five checks no longer means five scans.
+
+When a fused check fails, the original check is re-run so that the
+``AssertionError`` is exactly the one the check would have raised on
+its own.
+"""
+from __future__ import (unicode_literals, absolute_import, division)
+
+from itertools import groupby
+
+import engarde.checks as ck
+from engarde import cache, generic, instrument
+from engarde.config import CHEAP_CHECKS, LEVELS, options
+from engarde.sampling import WHOLE_FRAME
+
+
+class FrameStats(object):
+    """
+    Lazily computed, cached per-column intermediates of a DataFrame.
+
+    Each intermediate is computed at most once, the first time a check
+    asks for it.
+
+    Parameters
+    ==========
+    df : DataFrame
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self._cache = {}
+
+    def _get(self, key, func):
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = func()
+            return value
+
+    def column(self, col):
+        return self._get(('column', col), lambda: self.df[col])
+
+    def isnull(self, col):
+        return self._get(('isnull', col),
+                         lambda: self.column(col).isnull())
+
+    def has_nulls(self, col):
+        if ('isnull', col) in self._cache:
+            return self._get(('has_nulls', col),
+                             lambda: bool(self.isnull(col).values.any()))
+        return self._get(('has_nulls', col),
+                         lambda: generic.has_missing(self.column(col)))
+
+    def min(self, col):
+        return self._get(('min', col), lambda: self.column(col).min())
+
+    def max(self, col):
+        return self._get(('max', col), lambda: self.column(col).max())
+
+    def isin(self, col, values):
+        # keyed on identity: the values are owned by a step in the plan
+        # and so stay alive for as long as these stats do
+        return self._get(('isin', col, id(values)),
+                         lambda: generic.ValueSet.of(values).contains(
+                             self.column(col)))
+
+    def is_unique(self, col):
+        return self._get(('is_unique', col),
+                         lambda: self.column(col).is_unique)
+
+    def fingerprint(self):
+        from engarde.fingerprint import fingerprint
+        return self._get(('fingerprint',), lambda: fingerprint(self.df))
+
+
+# -------------
+# Fused kernels
+# -------------
+# Each kernel takes a ``FrameStats`` and the arguments of its check,
+# and returns True when the check passes. Anything else makes the plan
+# fall back to the check itself, which raises the informative error.
+
+def _none_missing(stats, columns=None):
+    if columns is None:
+        columns = stats.df.columns
+    return not any(stats.has_nulls(col) for col in columns)
+
+
+def _unique(stats, columns=None):
+    if columns is None:
+        columns = stats.df.columns
+    return all(stats.is_unique(col) for col in columns)
+
+
+def _within_set(stats, items=None):
+    return all(stats.isin(k, v).all() for k, v in items.items())
+
+
+def _within_range(stats, items=None):
+    for k, (lower, upper) in items.items():
+        # NaN bounds (all-missing columns) compare False, as in the check
+        if lower > stats.min(k) or upper < stats.max(k):
+            return False
+    return True
+
+
+_KERNELS = {
+    ck.none_missing: _none_missing,
+    ck.unique: _unique,
+    ck.within_set: _within_set,
+    ck.within_range: _within_range,
+}
+
+
+class Step(object):
+    """
+    A single check and its arguments.
+
+    Parameters
+    ==========
+    check : function
+      one of the functions in ``engarde.checks``, or any function taking
+      a DataFrame first and raising ``AssertionError`` on failure
+    args, kwargs :
+      the remaining arguments to ``check``
+    sample : Sample, optional
+      a sampling policy, see ``engarde.sampling``
+    label : str, optional
+      what the check is attached to, for ``engarde.instrument``
+    store : ResultStore, optional
+      where to look up and record outcomes, see ``engarde.store``
+    """
+
+    def __init__(self, check, args=(), kwargs=None, sample=None,
+                 label=None, store=None):
+        self.check = check
+        self.args = tuple(args)
+        self.kwargs = dict(kwargs or {})
+        self.sample = sample
+        self.label = label
+        self.store = store
+
+    def __repr__(self):
+        return 'Step({})'.format(self.check.__name__)
+
+    def run(self, df, stats):
+        if not options['cache_size']:
+            return self._stored(df, stats)
+        key = cache.key(self, df)
+        if key is None:
+            return self._stored(df, stats)
+        if not cache.hit(key, df):
+            self._stored(df, stats)
+            cache.store(key, df)
+
+    def _stored(self, df, stats):
+        if self.store is None:
+            return self._timed(df, stats)
+        key = self.store.key(self, stats.fingerprint())
+        if key is None:
+            return self._timed(df, stats)
+        if self.store.passed(key):
+            return
+        try:
+            self._timed(df, stats)
+        except AssertionError as e:
+            self.store.record(key, e)
+            raise
+        self.store.record(key)
+
+    def _timed(self, df, stats):
+        if not instrument.sinks:
+            return self._run(df, stats)
+        passed = False
+        start = instrument.timer()
+        try:
+            self._run(df, stats)
+            passed = True
+        finally:
+            rows, columns = df.shape
+            instrument.emit(instrument.Record(
+                self.label, self.check.__name__,
+                instrument.timer() - start, rows, columns, passed))
+
+    def _run(self, df, stats):
+        kernel = _KERNELS.get(self.check)
+        if kernel is not None:
+            try:
+                passed = kernel(stats, *self.args, **self.kwargs) is True
+            except Exception:
+                # let the check itself surface the problem
+                passed = False
+            if passed:
+                return
+        self.check(df, *self.args, **self.kwargs)
+
+
+class CheckPlan(object):
+    """
+    A collection of checks to be run in a single fused pass.
+
+    Plans are immutable; ``add`` returns a new plan.
+
+    Parameters
+    ==========
+    steps : iterable of Step
+
+    Examples
+    ========
+    >>> plan = (CheckPlan()
+    ...         .add(ck.none_missing)
+    ...         .add(ck.within_range, {'A': (0, 10)}))
+    >>> plan.validate(df)  # or df.pipe(plan)
+    """
+
+    def __init__(self, steps=()):
+        self.steps = tuple(steps)
+
+    def __repr__(self):
+        return 'CheckPlan({!r})'.format(list(self.steps))
+
+    def __len__(self):
+        return len(self.steps)
+
+    def add(self, check, *args, **kwargs):
+        """
+        Return a new plan with ``check(df, *args, **kwargs)`` appended.
+        """
+        return CheckPlan(self.steps + (Step(check, args, kwargs),))
+
+    def extend(self, other):
+        """
+        Return a new plan running the steps of ``self``, then ``other``.
+        """
+        return CheckPlan(self.steps + other.steps)
+
+    def at_level(self, level):
+        """
+        Return the plan restricted to the checks run at ``level``, one
+        of ``engarde.config.LEVELS``.
+        """
+        if level == 'all':
+            return self
+        elif level == 'cheap':
+            return CheckPlan(step for step in self.steps
+                             if step.check.__name__ in CHEAP_CHECKS)
+        elif level == 'off':
+            return CheckPlan()
+        raise ValueError("level must be one of {}, got {!r}".format(LEVELS,
+                                                                   level))
+
+    def validate(self, df, engine=None, n_jobs=None):
+        """
+        Run every check in the plan against ``df``, in order.
+
+        Parameters
+        ==========
+        df : DataFrame
+        engine : {None, 'threads', 'processes'}
+          run the checks on a pool of workers, see ``engarde.parallel``
+        n_jobs : int, optional
+          number of workers, defaults to the number of CPUs
+
+        Returns
+        =======
+        df : DataFrame
+          same as the input
+        """
+        resolved = self._resolve(df)
+        if engine is not None:
+            from engarde.parallel import validate
+            for _, group in groupby(resolved, key=lambda pair: id(pair[0])):
+                group = list(group)
+                validate(group[0][0], CheckPlan(step for _, step in group),
+                         engine=engine, n_jobs=n_jobs)
+            return df
+        stats = {}
+        for frame, step in resolved:
+            key = id(frame)
+            if key not in stats:
+                stats[key] = FrameStats(frame)
+            step.run(frame, stats[key])
+        return df
+
+    def _resolve(self, df):
+        """
+        Pair each step with the frame it checks, applying the sampling
+        policies. Each policy is drawn from once per call, however many
+        steps share it.
+        """
+        drawn = {}
+        disabled = options['disabled']
+        for step in self.steps:
+            if disabled and step.check.__name__ in disabled:
+                continue
+            sample = step.sample
+            if sample is None:
+                yield df, step
+                continue
+            if id(sample) not in drawn:
+                drawn[id(sample)] = sample.draw(df)
+            frame = drawn[id(sample)]
+            if frame is None:
+                continue
+            yield (df if step.check in WHOLE_FRAME else frame), step
+
+    __call__ = validate
+
+
+__all__ = ['CheckPlan']
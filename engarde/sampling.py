@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+sampling.py
+
+Sampling policies bounding the cost of checks on hot code paths.
+
+Every decorator in ``engarde.decorators`` takes a ``sample`` argument.
+A policy can skip calls (check every Nth call, or a random fraction of
+calls), check a random subset of the rows of each result, or both:
+
+>>> @none_missing(sample=Sample(every=100))
+>>> @within_range({'A': (0, 1)}, sample=Sample(fraction=0.1, rows=1000,
+...                                                seed=0))
+>>> def f(df):
+...     return df
+
+Row samples keep the original order of the rows, so order-dependent
+checks like ``is_monotonic`` stay meaningful. Checks about the frame as
+a whole always see the full result: ``is_shape``, ``is_same_as``,
+``is_close_to``, ``within_n_std``, whose statistics a sample would
+skew, and ``verify`` and ``verify_any``, whose predicates may need every
+row.
+"""
+from __future__ import (unicode_literals, absolute_import, division)
+
+import itertools
+
+import numpy as np
+
+import engarde.checks as ck
+
+# checks that are meaningless on a subset of the rows
+WHOLE_FRAME = {ck.is_shape, ck.is_same_as, ck.is_close_to, ck.within_n_std,
+               ck.verify, ck.verify_any}
+
+
+class Sample(object):
+    """
+    A sampling policy.
+
+    Parameters
+    ==========
+    every : int, optional
+      only check every ``every``-th call, starting with the first
+    fraction : float, optional
+      only check a random ``fraction`` of the calls
+    rows : int or float, optional
+      check a random sample of this many rows (int), or this fraction
+      of the rows (float), of each result
+    seed : int, optional
+      seed for the random draws, for reproducibility
+    """
+
+    def __init__(self, every=None, fraction=None, rows=None, seed=None):
+        if every is not None and every < 1:
+            raise ValueError("every must be >= 1, got {}".format(every))
+        if fraction is not None and not 0 <= fraction <= 1:
+            raise ValueError("fraction must be in [0, 1], got {}".format(
+                fraction))
+        if rows is not None and not (0 < rows <= 1 if isinstance(rows, float)
+                                     else rows >= 1):
+            raise ValueError("rows must be >= 1, or a fraction in (0, 1], "
+                             "got {}".format(rows))
+        self.every = every
+        self.fraction = fraction
+        self.rows = rows
+        self.seed = seed
+        self._calls = itertools.count()
+        self._rng = np.random.RandomState(seed)
+
+    def __repr__(self):
+        return 'Sample(every={}, fraction={}, rows={}, seed={})'.format(
+            self.every, self.fraction, self.rows, self.seed)
+
+    def should_check(self):
+        """
+        Whether this call should be checked at all.
+        """
+        call = next(self._calls)
+        if self.every is not None and call % self.every:
+            return False
+        if self.fraction is not None:
+            return self._rng.random_sample() < self.fraction
+        return True
+
+    def take(self, df):
+        """
+        The rows of ``df`` to check, in their original order.
+        """
+        if self.rows is None:
+            return df
+        n = len(df)
+        if isinstance(self.rows, float):
+            size = int(round(self.rows * n))
+        else:
+            size = self.rows
+        if size >= n:
+            return df
+        if size > n // 10:
+            positions = np.sort(self._rng.choice(n, size, replace=False))
+        else:
+            # drawing with replacement is O(size) rather than O(n); the
+            # few duplicate draws just make the sample slightly smaller
+            positions = np.unique(self._rng.randint(0, n, size))
+        return df.take(positions)
+
+    def draw(self, df):
+        """
+        The frame to check for this call, or None to skip it.
+        """
+        if not self.should_check():
+            return None
+        return self.take(df)
+
+
+__all__ = ['Sample']
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+schema.py
+
+Declare what a DataFrame should look like once, and check frames
+against it as often as needed.
+
+>>> schema = Schema({
+...     'id': {'dtype': 'int64', 'nullable': False, 'unique': True},
+...     'price': {'dtype': float, 'range': (0, 1e6)},
+...     'kind': {'allowed': {'buy', 'sell'}},
+...     'time': {'monotonic': True},
+... })
+>>> schema(df)            # or schema.validate(df), or df.pipe(schema)
+>>> @schema
+... def load(path):
+...     return pd.read_csv(path)
+
+All the work that doesn't depend on the frame is done when the schema
+is built: dtypes are resolved to dtype objects, allowed values compiled
+to ``ValueSet`` hash tables, and the constraints gathered into one
+``CheckPlan`` with a single step per kind of check, its columns grouped
+by dtype. Checking a frame only runs that plan, sharing intermediates
+between the steps.
+
+As a decorator, the schema joins the plan of any engarde decorators
+stacked with it.
+"""
+from __future__ import (unicode_literals, absolute_import, division)
+
+from collections import OrderedDict
+
+import pandas as pd
+
+import engarde.checks as ck
+from engarde.decorators import _decorator
+from engarde.generic import ValueSet
+from engarde.plan import CheckPlan, Step
+
+# constraints a column can have, see ``Schema``
+CONSTRAINTS = ('dtype', 'nullable', 'range', 'allowed', 'unique',
+               'monotonic')
+
+
+def _resolve(dtype):
+    """
+    The dtype object of ``dtype``, or its name if it stands for a family
+    of dtypes, like ``'category'`` without categories.
+    """
+    resolved = pd.api.types.pandas_dtype(dtype)
+    if (isinstance(resolved, pd.CategoricalDtype) and
+            resolved.categories is None):
+        return resolved.name
+    return resolved
+
+
+def _monotonic(value):
+    """The ``(increasing, strict)`` pair ``is_monotonic`` expects."""
+    if value is True:
+        return True, False
+    increasing, strict = value
+    return increasing, strict
+
+
+class Schema(object):
+    """
+    The expected columns of a DataFrame, and the constraints on each.
+
+    Parameters
+    ==========
+    columns : dict
+      maps each column to a dict of its constraints, any of
+
+      - ``dtype``: anything ``pd.api.types.pandas_dtype`` understands
+      - ``nullable``: whether missing values are allowed, default True
+      - ``range``: a ``(low, high)`` tuple the values lie within
+      - ``allowed``: array-like of the values allowed
+      - ``unique``: whether the values are unique, default False
+      - ``monotonic``: True for increasing, or an ``(increasing,
+        strict)`` tuple as in ``is_monotonic``
+
+      Every column must be present, constrained or not.
+
+    Examples
+    ========
+    >>> schema = Schema({'A': {'dtype': 'int64', 'range': (0, 10)}})
+    >>> schema.validate(df)
+    """
+
+    def __init__(self, columns):
+        self.columns = OrderedDict(columns)
+        for name, spec in self.columns.items():
+            unknown = set(spec) - set(CONSTRAINTS)
+            if unknown:
+                raise ValueError("Unknown constraints for column {!r}: {}"
+                                 .format(name, sorted(unknown)))
+        self.dtypes = OrderedDict(
+            (name, _resolve(spec['dtype']))
+            for name, spec in self.columns.items() if 'dtype' in spec)
+        self._steps = self._compile()
+        self.plan = CheckPlan(self._make_steps(None))
+
+    def __repr__(self):
+        return 'Schema({!r})'.format(list(self.columns))
+
+    def _ordered(self, constraint):
+        """
+        The columns with ``constraint``, grouped by their dtype, so that
+        the columns of a block are visited together.
+        """
+        names = [name for name, spec in self.columns.items()
+                 if constraint(spec)]
+        groups = OrderedDict()
+        for name in names:
+            groups.setdefault(str(self.dtypes.get(name)), []).append(name)
+        return [name for group in groups.values() for name in group]
+
+    def _compile(self):
+        """
+        The ``(check, args, kwargs)`` of each step, cheapest first.
+        """
+        specs = self.columns
+        steps = [(ck.has_columns, (list(specs),), {})]
+        if self.dtypes:
+            steps.append((ck.has_dtypes, (dict(self.dtypes),), {}))
+        not_null = self._ordered(lambda spec: spec.get('nullable') is False)
+        if not_null:
+            steps.append((ck.none_missing, (), {'columns': not_null}))
+        allowed = OrderedDict(
+            (name, ValueSet.of(specs[name]['allowed']))
+            for name in self._ordered(lambda spec: 'allowed' in spec))
+        if allowed:
+            steps.append((ck.within_set, (allowed,), {}))
+        ranges = OrderedDict(
+            (name, tuple(specs[name]['range']))
+            for name in self._ordered(lambda spec: 'range' in spec))
+        if ranges:
+            steps.append((ck.within_range, (ranges,), {}))
+        unique = self._ordered(lambda spec: spec.get('unique'))
+        if unique:
+            steps.append((ck.unique, (), {'columns': unique}))
+        monotonic = OrderedDict(
+            (name, _monotonic(spec['monotonic']))
+            for name, spec in specs.items() if spec.get('monotonic'))
+        if monotonic:
+            steps.append((ck.is_monotonic, (), {'items': monotonic}))
+        return steps
+
+    def _make_steps(self, label):
+        return [Step(check, args, kwargs, label=label)
+                for check, args, kwargs in self._steps]
+
+    def validate(self, df, engine=None, n_jobs=None):
+        """
+        Check ``df`` against the schema.
+
+        Parameters
+        ==========
+        df : DataFrame
+        engine : {None, 'threads', 'processes'}
+          run the checks on a pool of workers, see ``engarde.parallel``
+        n_jobs : int, optional
+          number of workers, defaults to the number of CPUs
+
+        Returns
+        =======
+        df : DataFrame
+          same as the input
+        """
+        return self.plan.validate(df, engine=engine, n_jobs=n_jobs)
+
+    def __call__(self, obj):
+        """
+        Check ``obj`` if it's a DataFrame; decorate it, to check the
+        DataFrames it returns, if it's a function.
+        """
+        if isinstance(obj, pd.DataFrame):
+            return self.validate(obj)
+        if not callable(obj):
+            raise TypeError("A Schema checks DataFrames or decorates "
+                            "functions, got {}".format(type(obj).__name__))
+        return _decorator(self._make_steps)(obj)
+
+
+__all__ = ['Schema', 'CONSTRAINTS']
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+sketch.py
+
+Fixed-size summaries of key columns too large for an exact hash table.
+
+- ``BloomFilter`` answers "may this key have been seen before?" with no
+  false negatives and a configurable false positive rate
+- ``HyperLogLog`` estimates the number of distinct keys
+
+Both work on the 64-bit hashes of ``hash_values``, so a chunk is
+sketched with a few vectorized numpy operations.
+"""
+from __future__ import (unicode_literals, absolute_import, division)
+
+import math
+
+import numpy as np
+import pandas as pd
+
+# odd multiplier from splitmix64, deriving a second hash from the first
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def hash_values(values):
+    """
+    64-bit hashes of ``values``, a Series or an Index. Equal values,
+    missing ones included, hash equal.
+
+    Integers and floats hash by their value as a float64, so that ``3``
+    hashes the same in an int64 chunk as ``3.0`` does in a float64 one,
+    as when missing values turn up in some chunks of a csv. Integers
+    beyond 2 ** 53 may collide, which only costs false positives.
+    """
+    dtype = values.dtype
+    if (pd.api.types.is_integer_dtype(dtype) or
+            pd.api.types.is_float_dtype(dtype)):
+        floats = values.to_numpy(dtype='float64', na_value=np.nan,
+                                 copy=True)
+        # -0. and 0. are equal, but not bit for bit
+        floats += 0.
+        return pd.util.hash_array(floats)
+    return pd.util.hash_pandas_object(values, index=False).values
+
+
+class BloomFilter(object):
+    """
+    A Bloom filter sized for ``capacity`` keys.
+
+    Parameters
+    ==========
+    capacity : int
+      number of distinct keys expected
+    error_rate : float
+      false positive rate once ``capacity`` keys were added
+
+    Notes
+    =====
+    Takes about ``-log(error_rate) / log(2) ** 2`` bits per key, e.g.
+    1.2 bytes at 1%, or 1.8 bytes at 0.1%.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be in (0, 1), got {}".format(
+                error_rate))
+        bits = -capacity * math.log(error_rate) / math.log(2) ** 2
+        self.size = max(int(math.ceil(bits / 64)) * 64, 64)
+        self.hashes = max(int(round(self.size / max(capacity, 1) *
+                                    math.log(2))), 1)
+        self.bits = np.zeros(self.size // 8, dtype=np.uint8)
+
+    def __repr__(self):
+        return 'BloomFilter(size={}, hashes={})'.format(self.size,
+                                                        self.hashes)
+
+    def _positions(self, hashes):
+        # double hashing: the i-th probe is h1 + i * h2
+        h2 = (hashes * _MIX) | np.uint64(1)
+        size = np.uint64(self.size)
+        with np.errstate(over='ignore'):
+            return [(hashes + np.uint64(i) * h2) % size
+                    for i in range(self.hashes)]
+
+    def add(self, hashes):
+        """
+        Add ``hashes``, returning a boolean array, True where the key may
+        already have been added, by this call or an earlier one.
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        seen = np.ones(len(hashes), dtype=bool)
+        positions = self._positions(hashes)
+        for pos in positions:
+            byte, bit = pos >> np.uint64(3), (pos & np.uint64(7))
+            seen &= (self.bits[byte] >> bit.astype(np.uint8)) & 1 == 1
+        # keys repeated within the call aren't in the filter yet
+        seen |= pd.Series(hashes).duplicated().values
+        one = np.uint8(1)
+        for pos in positions:
+            byte, bit = pos >> np.uint64(3), (pos & np.uint64(7))
+            np.bitwise_or.at(self.bits, byte, one << bit.astype(np.uint8))
+        return seen
+
+
+class HyperLogLog(object):
+    """
+    Estimate the number of distinct keys.
+
+    Parameters
+    ==========
+    precision : int
+      the sketch has ``2 ** precision`` one-byte registers, for a
+      relative error of about ``1.04 / sqrt(2 ** precision)``; 0.8% for
+      the default of 14
+    """
+
+    def __init__(self, precision=14):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be in [4, 18], got {}".format(
+                precision))
+        self.precision = precision
+        self.registers = np.zeros(2 ** precision, dtype=np.uint8)
+
+    def __repr__(self):
+        return 'HyperLogLog(precision={})'.format(self.precision)
+
+    def add(self, hashes):
+        """
+        Add ``hashes``.
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.intp)
+        rest = hashes << np.uint64(p)
+        # position of the leftmost 1 bit among the remaining 64 - p bits
+        rank = np.full(len(hashes), 64 - p + 1, dtype=np.uint8)
+        nonzero = rest != 0
+        # the float conversion may round up to 2 ** 64, hence the clip
+        top = np.floor(np.log2(rest[nonzero].astype(float)))
+        rank[nonzero] = np.clip(64 - top, 1, 64 - p)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other):
+        """
+        Combine with ``other``, of the same precision, in place.
+        """
+        if other.precision != self.precision:
+            raise ValueError("Can't merge sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        """
+        The estimated number of distinct keys added.
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(
+            np.ldexp(1.0, -self.registers.astype(int)))
+        zeros = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and zeros:
+            # small range correction: linear counting
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+__all__ = ['BloomFilter', 'HyperLogLog', 'hash_values']
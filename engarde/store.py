@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+store.py
+
+A persistent record of check outcomes, so reruns over unchanged data
+don't re-prove what is already known.
+
+>>> store = ResultStore('checks.sqlite')
+>>> @none_missing(store=store)
+... @unique(['id'], store=store)
+... def load(path):
+...     return pd.read_csv(path)
+
+Outcomes are keyed on the ``engarde.fingerprint`` of the frame checked,
+the check, its arguments and the engarde version. A check already known
+to pass on a frame returns at once; anything else runs, and its outcome
+is recorded. Known failures run again, so that they raise the check's
+usual, detailed error.
+
+The fingerprint hashes the whole frame, once per plan, however many
+checks use the store. That pays off for expensive checks, or several
+checks, over data that rarely changes.
+
+Checks and their arguments are identified by their contents; functions
+by their module, name, code, defaults and closure, so editing a
+predicate passed to ``verify`` invalidates its outcomes. Globals a
+function reads are not part of its identity. Checks with arguments that
+can't be identified across runs, like arbitrary objects, aren't
+recorded.
+"""
+from __future__ import (unicode_literals, absolute_import, division)
+
+import hashlib
+import sqlite3
+import threading
+import time
+import types
+import weakref
+
+import numpy as np
+import pandas as pd
+
+import engarde
+from engarde.fingerprint import fingerprint
+from engarde.generic import ValueSet
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    fingerprint TEXT NOT NULL,
+    check_name TEXT NOT NULL,
+    params TEXT NOT NULL,
+    version TEXT NOT NULL,
+    passed INTEGER NOT NULL,
+    summary TEXT,
+    checked_at REAL NOT NULL,
+    PRIMARY KEY (fingerprint, check_name, params, version)
+)
+"""
+
+# longest failure summary recorded
+SUMMARY_LENGTH = 1000
+
+
+def _stable(obj):
+    """
+    A string identifying ``obj`` by its contents, the same in every run;
+    raises TypeError if there's none.
+    """
+    if obj is None or isinstance(obj, (bool, int, float, str, bytes)):
+        return repr(obj)
+    if isinstance(obj, np.generic):
+        return repr(obj.item())
+    if isinstance(obj, (list, tuple)):
+        return '[{}]'.format(', '.join(_stable(v) for v in obj))
+    if isinstance(obj, dict):
+        return '{{{}}}'.format(', '.join(sorted(
+            '{}: {}'.format(_stable(k), _stable(v)) for k, v in obj.items())))
+    if isinstance(obj, (set, frozenset, ValueSet)):
+        return '{{{}}}'.format(', '.join(sorted(_stable(v) for v in obj)))
+    if isinstance(obj, (np.dtype, type)):
+        return str(obj)
+    if isinstance(obj, pd.DataFrame):
+        return 'DataFrame({})'.format(fingerprint(obj))
+    if isinstance(obj, pd.Series):
+        return 'Series({})'.format(fingerprint(obj.to_frame()))
+    if isinstance(obj, types.FunctionType):
+        closure = [cell.cell_contents for cell in obj.__closure__ or ()]
+        return '{}({}, {}, {})'.format(
+            _name(obj), _code(obj.__code__), _stable(obj.__defaults__),
+            _stable(closure))
+    raise TypeError("Can't identify {!r} across runs".format(obj))
+
+
+def _name(func):
+    return '{}.{}'.format(func.__module__,
+                          getattr(func, '__qualname__', func.__name__))
+
+
+def _code(code):
+    """A digest of the code object ``code``, and the code nested in it."""
+    consts = [_code(c) if isinstance(c, types.CodeType) else _stable(c)
+              for c in code.co_consts]
+    digest = hashlib.sha1(code.co_code)
+    digest.update(_stable([consts, list(code.co_names)]).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _summary(error):
+    summary = '\n'.join(str(arg) for arg in error.args)
+    return summary[:SUMMARY_LENGTH]
+
+
+class ResultStore(object):
+    """
+    Check outcomes recorded in a SQLite database.
+
+    Parameters
+    ==========
+    path : str
+      the database file, created if needed; ``':memory:'`` for a store
+      lasting as long as the object
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # steps are immutable, so their arguments are identified once
+        self._params = weakref.WeakKeyDictionary()
+        with self._conn:
+            self._conn.execute(_SCHEMA)
+
+    def __repr__(self):
+        return 'ResultStore({!r})'.format(self.path)
+
+    @classmethod
+    def of(cls, store):
+        """
+        ``store`` if it's a ``ResultStore``, else a store at that path.
+        """
+        if store is None or isinstance(store, cls):
+            return store
+        return cls(store)
+
+    def key(self, step, fingerprint):
+        """
+        The key of ``step`` run on a frame with ``fingerprint``, or None
+        if its arguments can't be identified across runs.
+        """
+        try:
+            params = self._params[step]
+        except KeyError:
+            try:
+                params = _stable([step.check, step.args, step.kwargs])
+                params = hashlib.sha1(params.encode('utf-8')).hexdigest()
+            except TypeError:
+                params = None
+            self._params[step] = params
+        if params is None:
+            return None
+        return (fingerprint, _name(step.check), params,
+                engarde.__version__)
+
+    def passed(self, key):
+        """
+        Whether the check of ``key`` is known to pass.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT passed FROM results WHERE fingerprint = ? AND "
+                "check_name = ? AND params = ? AND version = ?",
+                key).fetchone()
+        return bool(row and row[0])
+
+    def record(self, key, error=None):
+        """
+        Record the outcome of the check of ``key``: a pass, or the
+        ``AssertionError`` it failed with.
+        """
+        summary = None if error is None else _summary(error)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                key + (error is None, summary, time.time()))
+
+    def results(self):
+        """
+        Every outcome recorded, as a DataFrame.
+        """
+        with self._lock:
+            return pd.read_sql_query("SELECT * FROM results", self._conn)
+
+    def clear(self):
+        """
+        Forget every outcome.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM results")
+
+    def close(self):
+        self._conn.close()
+
+
+__all__ = ['ResultStore']
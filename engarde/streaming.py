@@ -0,0 +1,894 @@
+# -*- coding: utf-8 -*-
+"""
+streaming.py
+
+Validate data that arrives as an iterator of DataFrame chunks, e.g.
+``pd.read_csv(path, chunksize=100000)``, without ever holding the whole
+dataset in memory.
+
+Row-local checks (``none_missing``, ``within_range``, ``within_set``,
+``has_columns``, ``has_dtypes``, ``verify_all``, ``verify_expr``) are
+applied to each chunk on its own.
+Checks that depend on the whole dataset carry a small state from chunk
+to chunk:
+
+- ``unique``, ``unique_index``: the values seen so far
+- ``is_monotonic``: the last value of each column, and which directions
+  are still possible
+- ``within_n_std``: running count, mean, variance, min and max, unless
+  checking against fitted ``stats``, which is row-local
+- ``one_to_many``: the ``unitcol`` value seen for each ``manycol`` value
+- ``is_shape``: the running row count
+- ``verify_any``: whether any chunk has passed yet
+
+Peak memory is bounded by the chunk size, plus, for ``unique``,
+``unique_index`` and ``one_to_many``, the distinct keys seen so far.
+A chunk failing a check leaves the states as they were before it.
+
+The same states validate a table that grows by appending: a
+``StreamValidator`` can ``save`` them to a SQLite database and ``load``
+them back, and ``validate_appended`` checks each new partition against
+the state of the rows before it. Distinct keys are saved one per row,
+indexed by hash, so an append only looks up and adds the keys of the new
+partition, in time proportional to it rather than to the table.
+
+For key columns too large to keep an exact set of, ``approx_unique``
+finds candidate duplicates with a Bloom filter and confirms them with a
+second pass.
+"""
+from __future__ import (unicode_literals, absolute_import, division)
+
+import copy
+import os
+import pickle
+import sqlite3
+import uuid
+
+import numpy as np
+import pandas as pd
+import six
+
+import engarde.checks as ck
+from engarde.plan import CheckPlan, FrameStats
+from engarde.sketch import BloomFilter, HyperLogLog, hash_values
+
+
+class RunningStats(object):
+    """
+    Per-column count, mean, variance, min and max of a DataFrame seen one
+    chunk at a time.
+
+    Chunks are merged with the pairwise update of Chan et al., which is
+    numerically stable and gives the same result as computing over the
+    concatenated chunks.
+    """
+
+    def __init__(self):
+        self.count = None
+        self.mean = None
+        self.m2 = None
+        self.min = None
+        self.max = None
+        self.nulls = None
+
+    def update(self, df):
+        count = df.count()
+        mean = df.mean()
+        m2 = ((df - mean) ** 2).sum()
+        nulls = len(df) - count
+        mn, mx = df.min(), df.max()
+        if self.count is None:
+            self.count, self.mean, self.m2 = count, mean, m2
+            self.min, self.max, self.nulls = mn, mx, nulls
+            return self
+        n = self.count + count
+        delta = (mean - self.mean).fillna(0)
+        weight = (count / n).fillna(0)
+        self.mean = self.mean.fillna(mean) + delta * weight
+        self.m2 = (self.m2 + m2 +
+                   delta ** 2 * (self.count * weight).fillna(0))
+        self.count = n
+        self.min = np.fmin(self.min, mn)
+        self.max = np.fmax(self.max, mx)
+        self.nulls = self.nulls + nulls
+        return self
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / (self.count - 1))
+
+    @classmethod
+    def fit(cls, data):
+        """
+        Stats of the numeric columns of ``data``, a DataFrame or an
+        iterable of chunks, e.g. a reference dataset to check new data
+        against with ``within_n_std(df, stats=...)``.
+        """
+        if isinstance(data, pd.DataFrame):
+            data = [data]
+        self = cls()
+        for chunk in data:
+            self.update(chunk.select_dtypes(include=['number', 'bool']))
+        return self
+
+    _FIELDS = ['count', 'mean', 'm2', 'min', 'max', 'nulls']
+
+    def to_frame(self):
+        """
+        The fitted stats as a DataFrame, one row per column, for storage.
+        """
+        return pd.DataFrame({k: getattr(self, k) for k in self._FIELDS},
+                            columns=self._FIELDS)
+
+    @classmethod
+    def from_frame(cls, df):
+        """
+        Stats stored with ``to_frame``.
+        """
+        self = cls()
+        for k in cls._FIELDS:
+            setattr(self, k, df[k])
+        return self
+
+
+# ------------
+# Chunk states
+# ------------
+# Each state has ``update(chunk, stats)``, called once per chunk with
+# that chunk's ``FrameStats``, and ``finalize()``, called once all the
+# chunks have been seen. Both raise ``AssertionError`` on failure.
+#
+# ``update`` only checks the chunk, without changing the state, and
+# returns a commit: a function taking the chunk into the state, which
+# returns a function undoing that. A chunk is only committed once every
+# state has accepted it, so a failing chunk leaves no trace.
+#
+# ``saved`` names the attributes summarizing the chunks seen so far,
+# which ``StreamValidator.save`` persists.
+
+def _nothing():
+    return _nothing
+
+
+def _assign(obj, **values):
+    """
+    A commit setting the attributes ``values`` of ``obj``, for states
+    small enough to replace whole.
+    """
+    def commit():
+        old = {k: getattr(obj, k) for k in values}
+        obj.__dict__.update(values)
+        return lambda: obj.__dict__.update(old)
+    return commit
+
+
+# ----------
+# Key stores
+# ----------
+# ``unique``, ``unique_index`` and ``one_to_many`` remember every distinct
+# key seen. Keys taken in since the state was last saved or loaded are
+# held in memory; the others stay in the database it was saved to, and
+# only those of the keys in a chunk are looked up, so appending to a
+# saved state costs time proportional to the chunk, not to the table.
+# Keys that are neither numbers nor strings are compared by their
+# pickles there.
+
+# stands for a key not seen yet, as None or NaN may be a unit seen
+_ABSENT = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    id INTEGER PRIMARY KEY,
+    saved BLOB NOT NULL
+);
+CREATE TEMP TABLE IF NOT EXISTS probe (key);
+"""
+
+# SQLite's integers
+_INT64 = (-2 ** 63, 2 ** 63)
+
+
+def _encode(obj):
+    """
+    ``obj`` as SQLite stores it: integers, finite floats and strings as
+    they are, which SQLite compares by value, so that ``3`` and ``3.0``
+    match as they do in Python; None as NULL; anything else pickled.
+    """
+    if obj is None:
+        return None
+    if isinstance(obj, six.integer_types) and not isinstance(obj, bool):
+        if _INT64[0] <= obj < _INT64[1]:
+            return obj
+    elif isinstance(obj, float) and np.isfinite(obj):
+        return obj
+    elif isinstance(obj, six.text_type):
+        return obj
+    return sqlite3.Binary(pickle.dumps(obj, protocol=2))
+
+
+def _decode(value):
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return pickle.loads(bytes(value))
+    return value
+
+
+def _table(slot):
+    return '"keys_{}"'.format(slot)
+
+
+class _KeyDB(object):
+    """
+    The SQLite database a ``StreamValidator`` is saved to: its pickled
+    state, and a table of the keys of each of its key stores.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+
+    def tables(self, schema='main'):
+        return [row[0] for row in self.conn.execute(
+            "SELECT name FROM {}.sqlite_master WHERE type = 'table' AND "
+            "name LIKE 'keys\\_%' ESCAPE '\\'".format(schema))]
+
+    def create(self, slot):
+        self.conn.execute("CREATE TABLE IF NOT EXISTS {} (key PRIMARY KEY, "
+                          "value) WITHOUT ROWID".format(_table(slot)))
+
+    def get(self, slot, keys):
+        """
+        The value of each of ``keys`` in the key store ``slot``, or
+        ``_ABSENT``.
+        """
+        encoded = [_encode(key) for key in keys]
+        with self.conn:
+            self.conn.execute("DELETE FROM probe")
+            self.conn.executemany("INSERT INTO probe VALUES (?)",
+                                  [(key,) for key in encoded])
+            saved = dict(self.conn.execute(
+                "SELECT key, value FROM {} WHERE key IN (SELECT key FROM "
+                "probe)".format(_table(slot))))
+        return [_decode(saved[key]) if key in saved else _ABSENT
+                for key in (bytes(key) if isinstance(key, sqlite3.Binary)
+                            else key for key in encoded)]
+
+    def insert(self, slot, items):
+        """Add the ``(key, value)`` pairs ``items`` to the store ``slot``."""
+        self.create(slot)
+        self.conn.executemany(
+            "INSERT INTO {} VALUES (?, ?)".format(_table(slot)),
+            ((_encode(key), _encode(value)) for key, value in items))
+
+
+class _Keys(object):
+    """
+    The distinct keys a state has seen, each mapped to a value.
+    """
+
+    def __init__(self):
+        self.slot = uuid.uuid4().hex
+        # the keys since the last save or load
+        self.new = {}
+        self.db = None
+
+    def __getstate__(self):
+        # the saved keys stay in the database
+        return {'slot': self.slot, 'new': self.new}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state, db=None)
+
+    def __eq__(self, other):
+        return (isinstance(other, _Keys) and self.slot == other.slot and
+                self.new == other.new)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def get(self, keys):
+        """The value of each of the list ``keys``, or ``_ABSENT``."""
+        new = self.new
+        found = [new.get(key, _ABSENT) for key in keys]
+        if self.db is not None:
+            rest = [i for i, value in enumerate(found) if value is _ABSENT]
+            if rest:
+                saved = self.db.get(self.slot, [keys[i] for i in rest])
+                for i, value in zip(rest, saved):
+                    found[i] = value
+        return found
+
+    def isdisjoint(self, keys):
+        """Whether none of the list ``keys`` was seen."""
+        if not six.viewkeys(self.new).isdisjoint(keys):
+            return False
+        return self.db is None or all(value is _ABSENT for value in
+                                      self.db.get(self.slot, keys))
+
+    def add(self, items):
+        """
+        A commit adding ``items``, a dict of keys not seen yet to their
+        values.
+        """
+        new = self.new
+
+        def commit():
+            new.update(items)
+
+            def rollback():
+                for key in items:
+                    del new[key]
+            return rollback
+        return commit
+
+
+def _key_stores(states):
+    """The ``_Keys`` among the saved attributes of ``states``."""
+    for state in states:
+        for name in state.saved:
+            value = getattr(state, name)
+            values = value.values() if isinstance(value, dict) else [value]
+            for keys in values:
+                if isinstance(keys, _Keys):
+                    yield keys
+
+
+class _Chunkwise(object):
+    saved = ()
+
+    def __init__(self, step):
+        self.step = step
+
+    def update(self, chunk, stats):
+        self.step.run(chunk, stats)
+        return _nothing
+
+    def finalize(self):
+        pass
+
+
+class _Unique(object):
+    saved = ('seen', 'nulls')
+
+    def __init__(self, columns=None):
+        self.columns = columns
+        self.seen = {}
+        self.nulls = {}
+
+    def update(self, chunk, stats):
+        columns = chunk.columns if self.columns is None else self.columns
+        nulls = dict(self.nulls)
+        commits = []
+        for col in columns:
+            isnull = stats.isnull(col)
+            nulls[col] = nulls.get(col, 0) + int(isnull.sum())
+            seen = self.seen.setdefault(col, _Keys())
+            values = stats.column(col)[~isnull].tolist()
+            if not (stats.is_unique(col) and nulls[col] <= 1 and
+                    seen.isdisjoint(values)):
+                raise AssertionError(
+                    "Column {!r} contains non-unique values".format(col))
+            commits.append(seen.add(dict.fromkeys(values)))
+        commits.append(_assign(self, nulls=nulls))
+
+        def commit():
+            rollbacks = [c() for c in commits]
+            return lambda: [rollback() for rollback in rollbacks]
+        return commit
+
+    def finalize(self):
+        pass
+
+
+class _UniqueIndex(object):
+    saved = ('seen',)
+
+    def __init__(self):
+        self.seen = _Keys()
+
+    def update(self, chunk, stats):
+        index = chunk.index
+        values = index.tolist()
+        if not (index.is_unique and self.seen.isdisjoint(values)):
+            seen = [value is not _ABSENT for value in self.seen.get(values)]
+            dupes = index[index.duplicated() | np.array(seen, dtype=bool)]
+            raise AssertionError(*dupes.unique())
+        return self.seen.add(dict.fromkeys(values))
+
+    def finalize(self):
+        pass
+
+
+class _Monotonic(object):
+    saved = ('last', 'directions')
+
+    def __init__(self, items=None, increasing=None, strict=False):
+        self.items = items
+        self.increasing = increasing
+        self.strict = strict
+        self.last = {}
+        self.directions = {}
+
+    def update(self, chunk, stats):
+        items = self.items
+        if items is None:
+            items = {k: (self.increasing, self.strict) for k in chunk}
+        last, all_directions = dict(self.last), dict(self.directions)
+        for col, (increasing, strict) in items.items():
+            s = stats.column(col)
+            if not len(s):
+                continue
+            if col in last:
+                s = pd.concat([last[col], s])
+            if increasing is None:
+                possible = {True, False}
+            else:
+                possible = {increasing}
+            directions = set(all_directions.get(col, possible))
+
+            s = pd.Index(s)
+            if strict and not s.is_unique:
+                directions.clear()
+            if not s.is_monotonic_increasing:
+                directions.discard(True)
+            if not s.is_monotonic_decreasing:
+                directions.discard(False)
+            if not directions:
+                raise AssertionError(
+                    "Column {!r} is not monotonic".format(col))
+            all_directions[col] = directions
+            last[col] = stats.column(col).iloc[-1:]
+        return _assign(self, last=last, directions=all_directions)
+
+    def finalize(self):
+        pass
+
+
+class _WithinNStd(object):
+    saved = ('stats',)
+
+    def __init__(self, n=3, stats=None):
+        self.n = n
+        self.fitted = stats
+        self.stats = RunningStats()
+
+    def update(self, chunk, stats):
+        if self.fitted is not None:
+            ck.within_n_std(chunk, self.n, self.fitted)
+            return _nothing
+        # updating replaces the attributes, so a shallow copy will do
+        running = copy.copy(self.stats)
+        running.update(chunk.select_dtypes(include=['number', 'bool']))
+        return _assign(self, stats=running)
+
+    def finalize(self):
+        s, n = self.stats, self.n
+        if s.count is None:
+            return
+        # every value is an inlier iff both extremes are
+        bound = n * s.std
+        good = (s.max - s.mean < bound) & (s.mean - s.min < bound)
+        good &= s.nulls == 0
+        if not good.all():
+            raise AssertionError("Values outside {} standard deviations "
+                                 "in columns".format(n),
+                                 list(good.index[~good]))
+
+
+class _OneToMany(object):
+    saved = ('units',)
+
+    def __init__(self, unitcol, manycol):
+        self.unitcol = unitcol
+        self.manycol = manycol
+        self.units = _Keys()
+
+    def update(self, chunk, stats):
+        unitcol, manycol = self.unitcol, self.manycol
+        pairs = chunk[[manycol, unitcol]].drop_duplicates()
+        ck.one_to_many(pairs, unitcol, manycol)
+        known = pd.Series(self.units.get(pairs[manycol].tolist()),
+                          index=pairs.index, dtype=object)
+        seen = (known != _ABSENT).values
+        unit = pairs[unitcol]
+        # missing units equal each other, as in drop_duplicates
+        same = (known == unit) | (known.isnull() & unit.isnull())
+        bad = seen & ~same.values
+        if bad.any():
+            many = pairs.loc[bad, manycol].iloc[0]
+            raise AssertionError("{} in {} has multiple values for {}".format(
+                many, manycol, unitcol))
+        new = pairs[~seen]
+        return self.units.add(dict(zip(new[manycol], new[unitcol])))
+
+    def finalize(self):
+        pass
+
+
+class _Shape(object):
+    saved = ('rows', 'columns')
+
+    def __init__(self, shape):
+        self.shape = shape
+        self.rows = 0
+        self.columns = None
+
+    def update(self, chunk, stats):
+        ck.is_shape(chunk, (None, self.shape[1]))
+        return _assign(self, rows=self.rows + len(chunk),
+                       columns=chunk.shape[1])
+
+    def finalize(self):
+        if self.columns is None:
+            return
+        actual = (self.rows, self.columns)
+        if not all(want in (None, -1) or want == got
+                   for want, got in zip(self.shape, actual)):
+            raise AssertionError("Expected shape: {}\n"
+                                 "\t\tActual shape:   {}".format(self.shape,
+                                                                  actual))
+
+
+class _VerifyAny(object):
+    saved = ('passed',)
+
+    def __init__(self, check, *args, **kwargs):
+        self.check = check
+        self.args = args
+        self.kwargs = kwargs
+        self.passed = False
+
+    def update(self, chunk, stats):
+        if self.passed:
+            return _nothing
+        passed = bool(np.any(self.check(chunk, *self.args, **self.kwargs)))
+        return _assign(self, passed=passed)
+
+    def finalize(self):
+        if not self.passed:
+            raise AssertionError(
+                '{} not true for any'.format(self.check.__name__))
+
+
+_CHUNKWISE = {ck.none_missing, ck.within_range, ck.within_set,
+              ck.has_columns, ck.has_dtypes, ck.verify_all, ck.verify_expr}
+
+_STATES = {
+    ck.unique: _Unique,
+    ck.unique_index: _UniqueIndex,
+    ck.is_monotonic: _Monotonic,
+    ck.within_n_std: _WithinNStd,
+    ck.one_to_many: _OneToMany,
+    ck.is_shape: _Shape,
+    ck.verify_any: _VerifyAny,
+}
+
+
+def _state(step):
+    if step.check in _CHUNKWISE:
+        return _Chunkwise(step)
+    try:
+        cls = _STATES[step.check]
+    except KeyError:
+        raise ValueError("{} can't be validated chunk by chunk".format(
+            step.check.__name__))
+    return cls(*step.args, **step.kwargs)
+
+
+class StreamValidator(object):
+    """
+    Validate a dataset one chunk at a time.
+
+    Parameters
+    ==========
+    plan : CheckPlan
+      the checks to run. ``verify`` and ``is_same_as`` need the whole
+      dataset at once and are not supported.
+
+    Examples
+    ========
+    >>> plan = CheckPlan().add(ck.none_missing).add(ck.unique, ['id'])
+    >>> validator = StreamValidator(plan)
+    >>> for chunk in validator.stream(pd.read_csv(path, chunksize=10**5)):
+    ...     process(chunk)
+    """
+
+    def __init__(self, plan):
+        self.plan = plan
+        self.states = [_state(step) for step in plan.steps]
+        self.rows = 0
+        # the database saved to or loaded from, see ``save``
+        self._db = None
+
+    def update(self, chunk):
+        """
+        Check a single chunk. Raises as soon as a check fails, leaving
+        the state as it was before the chunk.
+        """
+        self._update(chunk)
+        return chunk
+
+    def _update(self, chunk):
+        """Check and take in ``chunk``; return the function undoing it."""
+        stats = FrameStats(chunk)
+        commits = [state.update(chunk, stats) for state in self.states]
+        rollbacks = [commit() for commit in commits]
+        self.rows += len(chunk)
+
+        def rollback():
+            for undo in reversed(rollbacks):
+                undo()
+            self.rows -= len(chunk)
+        return rollback
+
+    def finalize(self):
+        """
+        Run the checks that can only be decided once every chunk is seen.
+        """
+        for state in self.states:
+            state.finalize()
+        return self
+
+    def stream(self, chunks):
+        """
+        Yield each chunk of ``chunks`` after checking it, finalizing
+        once the iterator is exhausted.
+        """
+        for chunk in chunks:
+            yield self.update(chunk)
+        self.finalize()
+
+    def append(self, chunk):
+        """
+        Check rows appended to the dataset seen so far: ``update``, then
+        ``finalize``, which leaves the state ready for the next append.
+        If either fails, the state is left as it was before the chunk.
+        """
+        rollback = self._update(chunk)
+        try:
+            self.finalize()
+        except AssertionError:
+            rollback()
+            raise
+        return chunk
+
+    def save(self, path):
+        """
+        Persist the state summarizing the rows seen so far to the SQLite
+        database ``path``, so that a later ``load`` only needs to check
+        the rows appended since.
+
+        The distinct keys of ``unique``, ``unique_index`` and
+        ``one_to_many`` are stored one per row, indexed by their hash.
+        Saving again to the database loaded from, or last saved to, only
+        adds the keys seen since, and a loaded state only looks up the
+        keys of the chunks it checks, so each append takes time
+        proportional to the rows appended. The database still grows with
+        the number of keys; for keys too many to keep, see
+        ``approx_unique``.
+        """
+        db = self._db
+        if db is None or os.path.abspath(db.path) != os.path.abspath(path):
+            db = _KeyDB(path)
+            with db.conn:
+                for table in db.tables():
+                    db.conn.execute("DROP TABLE {}".format(table))
+            if self._db is not None:
+                # a copy of the keys saved before
+                db.conn.execute("ATTACH DATABASE ? AS old", (self._db.path,))
+                with db.conn:
+                    for table in db.tables('old'):
+                        db.create(table[len('keys_'):])
+                        db.conn.execute("INSERT INTO {0} SELECT * FROM "
+                                        "old.{0}".format('"{}"'.format(table)))
+                db.conn.execute("DETACH DATABASE old")
+        stores = list(_key_stores(self.states))
+        pending = [keys.new for keys in stores]
+        try:
+            # only the keys' slots go in the pickled state
+            for keys in stores:
+                keys.new = {}
+            saved = {
+                'rows': self.rows,
+                'states': [{k: getattr(state, k) for k in state.saved}
+                           for state in self.states],
+            }
+            with db.conn:
+                for keys, new in zip(stores, pending):
+                    db.insert(keys.slot, new.items())
+                db.conn.execute(
+                    "INSERT OR REPLACE INTO state VALUES (0, ?)",
+                    (sqlite3.Binary(pickle.dumps(
+                        saved, protocol=pickle.HIGHEST_PROTOCOL)),))
+        except Exception:
+            for keys, new in zip(stores, pending):
+                keys.new = new
+            raise
+        for keys in stores:
+            keys.db = db
+        self._db = db
+
+    @classmethod
+    def load(cls, plan, path):
+        """
+        A validator for ``plan`` resuming from the state saved at
+        ``path`` by a validator for the same plan.
+        """
+        self = cls(plan)
+        if not os.path.exists(path):
+            raise IOError("No state saved at {}".format(path))
+        db = _KeyDB(path)
+        row = db.conn.execute("SELECT saved FROM state").fetchone()
+        if row is None:
+            raise ValueError("No state saved at {}".format(path))
+        saved = pickle.loads(bytes(row[0]))
+        states = saved['states']
+        if (len(states) != len(self.states) or
+                any(set(s) != set(state.saved)
+                    for s, state in zip(states, self.states))):
+            raise ValueError("The state saved at {} doesn't match the "
+                             "plan".format(path))
+        for s, state in zip(states, self.states):
+            state.__dict__.update(s)
+        for keys in _key_stores(self.states):
+            keys.db = db
+        self.rows = saved['rows']
+        self._db = db
+        return self
+
+
+def validate_chunks(chunks, plan):
+    """
+    Validate every chunk of ``chunks`` against ``plan``.
+
+    Parameters
+    ==========
+    chunks : iterable of DataFrame
+      e.g. ``pd.read_csv(path, chunksize=...)`` or ``read_parquet_chunks``
+    plan : CheckPlan or list of checks
+      a list is treated as checks taking no extra arguments
+
+    Returns
+    =======
+    validator : StreamValidator
+      with the number of ``rows`` validated
+    """
+    if not isinstance(plan, CheckPlan):
+        plan = _plan_from_checks(plan)
+    validator = StreamValidator(plan)
+    for chunk in chunks:
+        validator.update(chunk)
+    return validator.finalize()
+
+
+def validate_appended(chunk, plan, path):
+    """
+    Validate ``chunk``, rows appended to a dataset, against ``plan`` and
+    the state saved at ``path`` for the rows before them, then save the
+    state including ``chunk``. The cost depends on the size of
+    ``chunk``, not of the dataset.
+
+    Parameters
+    ==========
+    chunk : DataFrame
+    plan : CheckPlan or list of checks
+    path : str
+      the SQLite database holding the state, see ``StreamValidator.save``;
+      created by the first call. It isn't updated if ``chunk`` fails.
+
+    Returns
+    =======
+    validator : StreamValidator
+      with the total number of ``rows`` validated
+    """
+    if not isinstance(plan, CheckPlan):
+        plan = _plan_from_checks(plan)
+    if os.path.exists(path):
+        validator = StreamValidator.load(plan, path)
+    else:
+        validator = StreamValidator(plan)
+    validator.append(chunk)
+    validator.save(path)
+    return validator
+
+
+def approx_unique(chunks, columns=None, index=False, capacity=10 ** 8,
+                  error_rate=0.001):
+    """
+    Assert that key columns are unique across chunks, in memory
+    proportional to the number of keys, not to their size.
+
+    A first pass adds each key to a ``BloomFilter``; the keys it may
+    already have seen are candidate duplicates. A second pass counts
+    just the candidates exactly, so false positives are never reported.
+
+    Parameters
+    ==========
+    chunks : callable
+      returning a fresh iterable of DataFrames for each pass, e.g.
+      ``lambda: pd.read_csv(path, chunksize=10 ** 6)``
+    columns : list, optional
+      the key columns, each checked on its own. If None, check all
+      columns, unless ``index`` is set.
+    index : bool
+      check the index too, as for ``unique_index``
+    capacity : int
+      number of distinct keys expected per column
+    error_rate : float
+      false positive rate of the filter; only affects how many
+      candidates the second pass has to count
+
+    Returns
+    =======
+    distinct : Series
+      the estimated number of distinct keys of each column, and of the
+      index under ``None``, from a ``HyperLogLog``
+    """
+    def values(chunk, key):
+        return chunk.index if key is None else chunk[key]
+
+    keys = None
+    for chunk in chunks():
+        if keys is None:
+            keys = list(chunk.columns if columns is None and not index
+                        else columns or [])
+            if index:
+                keys.append(None)
+            blooms = {k: BloomFilter(capacity, error_rate) for k in keys}
+            counters = {k: HyperLogLog() for k in keys}
+            candidates = {k: set() for k in keys}
+        for key in keys:
+            s = values(chunk, key)
+            hashes = hash_values(s)
+            counters[key].add(hashes)
+            maybe = blooms[key].add(hashes)
+            if maybe.any():
+                candidates[key].update(s[maybe])
+    if keys is None:
+        return pd.Series([], dtype=int, name='distinct')
+    # free the filters before the second pass
+    del blooms
+
+    keys = [key for key in keys if candidates[key]]
+    counts = {key: pd.Series([], dtype=int) for key in keys}
+    if keys:
+        for chunk in chunks():
+            for key in keys:
+                s = values(chunk, key)
+                found = pd.Series(s[s.isin(candidates[key])])
+                counts[key] = counts[key].add(
+                    found.value_counts(dropna=False), fill_value=0)
+    for key in keys:
+        dupes = counts[key].index[counts[key] > 1].tolist()
+        if dupes:
+            if key is None:
+                raise AssertionError(*dupes)
+            raise AssertionError(
+                "Column {!r} contains non-unique values".format(key), dupes)
+    return pd.Series([c.count() for c in counters.values()],
+                     index=list(counters), name='distinct')
+
+
+def _plan_from_checks(checks):
+    plan = CheckPlan()
+    for check in checks:
+        plan = plan.add(check)
+    return plan
+
+
+def read_parquet_chunks(path, chunksize=65536, columns=None):
+    """
+    Iterate over a Parquet file as DataFrames of at most ``chunksize``
+    rows. Requires ``pyarrow``.
+    """
+    import pyarrow.parquet as pq
+
+    reader = pq.ParquetFile(path)
+    for batch in reader.iter_batches(batch_size=chunksize, columns=columns):
+        yield batch.to_pandas()
+
+
+__all__ = ['StreamValidator', 'validate_chunks', 'validate_appended',
+           'approx_unique', 'read_parquet_chunks', 'RunningStats']
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+import gc
+
+import pytest
+import numpy as np
+import pandas as pd
+import pandas.util.testing as tm
+
+import engarde.decorators as dc
+from engarde import cache
+from engarde.config import set_options
+from engarde.plan import CheckPlan
+
+
+@pytest.fixture
+def calls():
+    calls = []
+    cache.clear()
+    with set_options(cache_size=8):
+        yield calls
+    cache.clear()
+
+def _counting(calls):
+    def check(df, items):
+        calls.append(items)
+        if df.isnull().any().any():
+            raise AssertionError('missing')
+        return df
+    return check
+
+def test_repeated_checks_pass_at_once(calls):
+    check = _counting(calls)
+    df = pd.DataFrame({'A': [1., 2.], 'B': ['a', 'b']})
+    plan = CheckPlan().add(check, {'A': [1]})
+    plan.validate(df)
+    plan.validate(df)
+    CheckPlan().add(check, items={'A': [1]}).validate(df)
+    CheckPlan().add(check, {'A': [2]}).validate(df)
+    assert len(calls) == 3
+
+    # a different object, even an equal one, is checked again
+    plan.validate(df.copy())
+    assert len(calls) == 4
+
+def test_changes_are_noticed(calls):
+    check = _counting(calls)
+    plan = CheckPlan().add(check, None)
+    df = pd.DataFrame({'A': [1., 2.], 'B': ['a', 'b']})
+    plan.validate(df)
+    df['A'] = [np.nan, 1.]
+    with pytest.raises(AssertionError):
+        plan.validate(df)
+    df.fillna(0, inplace=True)
+    plan.validate(df)
+    df.index = ['x', 'y']
+    plan.validate(df)
+    plan.validate(df)
+    assert len(calls) == 4
+
+def test_failures_are_not_cached(calls):
+    check = _counting(calls)
+    df = pd.DataFrame({'A': [np.nan]})
+    for _ in range(2):
+        with pytest.raises(AssertionError):
+            CheckPlan().add(check, None).validate(df)
+    assert len(calls) == 2
+
+def test_frames_are_not_kept_alive(calls):
+    df = pd.DataFrame({'A': [1.]})
+    CheckPlan().add(_counting(calls), None).validate(df)
+    assert len(cache._entries) == 1
+    ref = cache._entries[next(iter(cache._entries))][0]
+    del df
+    gc.collect()
+    assert ref() is None
+
+def test_lru_eviction(calls):
+    check = _counting(calls)
+    df = pd.DataFrame({'A': [1.]})
+    plans = [CheckPlan().add(check, i) for i in range(9)]
+    for plan in plans:
+        plan.validate(df)
+    assert len(cache._entries) == 8
+    plans[8].validate(df)
+    plans[0].validate(df)
+    assert len(calls) == 10
+
+def test_decorators_share_the_cache(calls):
+    df = pd.DataFrame({'A': [1, 2]})
+    f = dc.has_dtypes({'A': df['A'].dtype})(lambda df: df)
+    g = dc.has_dtypes({'A': df['A'].dtype})(lambda df: df)
+    tm.assert_frame_equal(g(f(df)), df)
+    assert len(cache._entries) == 1
+
+def test_unhashable_arguments_are_not_cached(calls):
+    df = pd.DataFrame({'A': [1, 2]})
+    dc.is_same_as(df)(lambda df: df)(df)
+    assert not cache._entries
+
+def test_mutable_arguments_are_not_cached(calls):
+    from engarde.streaming import RunningStats
+    df = pd.DataFrame({'A': [1., 2., 3.]})
+    stats = RunningStats.fit(df)
+    plan = CheckPlan().add(dc.ck.within_n_std, 3, stats=stats)
+    plan.validate(df)
+    assert not cache._entries
+    stats.update(pd.DataFrame({'A': [2.] * 100}))
+    with pytest.raises(AssertionError):
+        plan.validate(df)
+
+    CheckPlan().add(dc.ck.within_range,
+                    {'A': (0, np.float64(5))}).validate(df)
+    assert len(cache._entries) == 1
+
+def test_off_by_default():
+    cache.clear()
+    CheckPlan().add(dc.ck.none_missing).validate(pd.DataFrame({'A': [1]}))
+    assert not cache._entries
+    with pytest.raises(ValueError):
+        set_options(cache_size=-1)
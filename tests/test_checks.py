@@ -6,6 +6,8 @@ import pandas.util.testing as tm
 
 import engarde.checks as ck
 import engarde.decorators as dc
+from engarde import generic
+from engarde.config import options
 
 
 def _add_n(df, n=1):
@@ -251,6 +253,18 @@ def test_one_to_many_raises():
     with pytest.raises(AssertionError):
         ck.one_to_many(df, 'units', 'parameter')
 
+def test_one_to_many_reports_all():
+    df = pd.DataFrame({
+        'parameter': ['Cu', 'Cu', 'Pb', 'Pb', 'Zn', 'Zn', np.nan, np.nan],
+        'units': ['ug/L', 'mg/L', 'ug/L', 'mg/L', 'ug/L', 'ug/L', 'a', 'b'],
+    })
+    with pytest.raises(AssertionError) as e:
+        ck.one_to_many(df, 'units', 'parameter')
+    msg, bad = e.value.args
+    assert msg == 'Cu, Pb in parameter has multiple values for units'
+    assert bad.index.tolist() == ['Cu', 'Pb']
+    assert bad['Pb'].tolist() == ['ug/L', 'mg/L']
+
 def test_verify():
     f = lambda x, n: len(x) > n
     df = pd.DataFrame({'A': [1, 2, 3]})
@@ -285,6 +299,39 @@ def test_verify_any():
         ck.verify_any(df, f, n=4)
         dc.verify_any(f, n=4)(df)
 
+def test_verify_expr():
+    df = pd.DataFrame({'price1': [1., 2., 3.], 'time1': [10, 500, 700]})
+    tm.assert_frame_equal(df, ck.verify_expr(df))
+    tm.assert_frame_equal(df, ck.verify_expr(df, 'price1 >= 0 & time1 > 0',
+                                             'price1 < time1'))
+    tm.assert_frame_equal(df, dc.verify_expr('price1 > 0')(_noop)(df))
+
+    with pytest.raises(AssertionError) as e:
+        ck.verify_expr(df, 'price1 >= 0', 'price1 >= 0 & time1 < 600')
+    msg, bad = e.value.args
+    assert msg == 'price1 >= 0 & time1 < 600 not true for all'
+    tm.assert_frame_equal(bad, df.iloc[[2]])
+
+    df.iloc[0, 0] = np.nan
+    with pytest.raises(AssertionError):
+        dc.verify_expr('price1 > 0')(_noop)(df)
+    with pytest.raises(TypeError):
+        dc.verify_expr('price1 > 0', smaple=2)
+
+def test_verify_expr_falls_back_to_eval():
+    df = pd.DataFrame({'A': [1, 2, 3], 'B': ['x', 'y', 'x']})
+    ck.verify_expr(df, '-1 < A <= 3 | B == "y"', 'index < 3')
+    with pytest.raises(AssertionError) as e:
+        ck.verify_expr(df, 'A > 1 & B == "x"')
+    tm.assert_frame_equal(e.value.args[1], df.iloc[[0, 1]])
+
+def test_verify_expr_translations_are_bounded(monkeypatch):
+    monkeypatch.setattr(generic, '_TRANSLATED_SIZE', 3)
+    df = pd.DataFrame({'A': [1., 2., 3.]})
+    for i in range(10):
+        ck.verify_expr(df, 'A < {}'.format(i + 4))
+    assert list(generic._TRANSLATED) == ['A < 11', 'A < 12', 'A < 13']
+
 def test_is_same_as():
     df = pd.DataFrame({'A': [1, 2, 3], 'B': [1, 2, 3]})
     df_equal = pd.DataFrame({'A': [1, 2, 3], 'B': [1, 2, 3]})
@@ -320,3 +367,257 @@ def test_is_same_as_with_kwargs():
 
     result = dc.is_same_as(df_equal_float, check_dtype=False)(_noop)(df)
     tm.assert_frame_equal(df, result)
+
+def test_is_same_as_blocks():
+    df = pd.DataFrame({'A': [1., np.nan, 3.], 'B': ['a', 'b', 'c'],
+                       'C': pd.Categorical(['x', 'y', 'x']),
+                       'D': pd.date_range('2000', periods=3),
+                       'E': [1j, 2j, 3j]})
+    assert generic.differing_blocks(df, df.copy()) == []
+    assert ck.is_same_as(df, df.copy()) is df
+
+    other = df.copy()
+    other.loc[2, 'B'] = 'z'
+    assert generic.differing_blocks(df, other, block_size=2) == [(1, 2, 3)]
+    with pytest.raises(AssertionError):
+        ck.is_same_as(df, other)
+
+    # equal to a tolerance, but not byte for byte
+    other = df.copy()
+    other['A'] += 1e-10
+    assert generic.differing_blocks(df, other) == [(0, 0, 3)]
+    assert ck.is_same_as(df, other) is df
+    with pytest.raises(AssertionError):
+        ck.is_same_as(df, other, check_exact=True)
+
+    assert generic.differing_blocks(df, df.set_index('B')) is None
+    assert generic.differing_blocks(df, df.rename(columns={'A': 'Z'})) is None
+    with pytest.raises(AssertionError):
+        ck.is_same_as(df, df.rename(columns={'A': 'Z'}))
+
+def test_is_same_as_unhashable():
+    df = pd.DataFrame({'A': [[1], [2, 3], []], 'B': [{'x': 1}, {}, None]})
+    assert generic.differing_blocks(df, df.copy()) == []
+
+    other = df.copy()
+    other.at[1, 'A'] = [2, 4]
+    assert generic.differing_blocks(df, other, block_size=2) == [(0, 0, 2)]
+
+def test_is_close_to():
+    df = pd.DataFrame({'A': [1., 2, np.nan, 4], 'B': [1, 2, 3, 4],
+                       'C': list('abcd')})
+    close = df.assign(A=df.A * (1 + 1e-7), C=list('wxyz'))
+    tm.assert_frame_equal(df, ck.is_close_to(df, close))
+    tm.assert_frame_equal(df, dc.is_close_to(close)(_noop)(df))
+
+    other = df.assign(A=[1., 2.5, np.nan, np.nan], B=[1, 2, 3, 5])
+    with pytest.raises(AssertionError) as e:
+        ck.is_close_to(df, other, n_rows=2, n_jobs=2)
+    message, errors, worst = e.value.args
+    assert message == "Not close"
+    assert errors['not_close'].to_dict() == {'A': 2, 'B': 1}
+    assert errors.loc['B', 'max_abs_error'] == 1
+    assert errors.loc['B', 'max_rel_error'] == .2
+    assert errors.loc['A', 'max_abs_error'] == np.inf
+    assert worst.index.tolist() == [3, 1]
+    assert worst[('A', 'right')].tolist()[1] == 2.5
+
+    ck.is_close_to(df, other.assign(A=df.A), atol=1)
+    with pytest.raises(AssertionError):
+        ck.is_close_to(df, df.drop(columns='B'))
+    with pytest.raises(AssertionError):
+        ck.is_close_to(df, df.iloc[:2])
+    with pytest.raises(AssertionError) as e:
+        ck.is_close_to(df, df.assign(B=list('abcd')))
+    assert e.value.args == ("Columns not numeric in df_to_compare", ['B'])
+
+def test_is_close_to_nullable():
+    df = pd.DataFrame({'A': pd.array([1, None, 3], dtype='Int64'),
+                       'B': pd.array([.5, 1., None], dtype='Float64')})
+    tm.assert_frame_equal(df, ck.is_close_to(df, df.copy()))
+    tm.assert_frame_equal(df, ck.is_close_to(df, df.astype(float)))
+    with pytest.raises(AssertionError) as e:
+        ck.is_close_to(df, df.assign(A=pd.array([1, 2, 4], dtype='Int64')))
+    assert e.value.args[1]['not_close'].to_dict() == {'A': 2}
+
+def test_has_columns():
+    df = pd.DataFrame({'A': [1, 2], 'B': [1., 2.]})
+    tm.assert_frame_equal(df, ck.has_columns(df, ['A', 'B']))
+    tm.assert_frame_equal(df, dc.has_columns(['B'])(_noop)(df))
+    with pytest.raises(AssertionError) as e:
+        ck.has_columns(df, ['A', 'C', 'D'])
+    assert e.value.args[1] == ['C', 'D']
+
+def test_bad_locations():
+    df = pd.DataFrame({'A': [True, False, True], 'B': [False, True, False]},
+                      index=['a', 'b', 'c'])
+    result = generic.bad_locations(df)
+    assert result.tolist() == [('a', 'A'), ('c', 'A'), ('b', 'B')]
+
+    result = generic.bad_locations(df, limit=2)
+    assert result.tolist() == [('a', 'A'), ('c', 'A'), '... 1 more (3 total)']
+
+    assert generic.bad_locations(~(df | True)).tolist() == []
+
+def test_none_missing_report_limit():
+    df = pd.DataFrame(np.nan, index=range(10), columns=['A', 'B'])
+    with pytest.raises(AssertionError) as e:
+        ck.none_missing(df)
+    assert len(e.value.args) == 20
+
+    options['report_limit'] = 5
+    try:
+        with pytest.raises(AssertionError) as e:
+            ck.none_missing(df)
+    finally:
+        options['report_limit'] = None
+    assert e.value.args[:2] == ((0, 'A'), (1, 'A'))
+    assert e.value.args[-1] == '... 15 more (20 total)'
+
+@pytest.mark.parametrize('values, expected', [
+    (np.arange(3), False),
+    (np.array([True, False]), False),
+    (np.array([1., 2.]), False),
+    (np.array([1., np.nan]), True),
+    (np.array([], dtype=float), False),
+    (['a', None], True),
+    (pd.to_datetime(['2015', None]), True),
+    (pd.Categorical(['a', np.nan]), True),
+])
+def test_has_missing(values, expected):
+    assert generic.has_missing(pd.Series(values)) is expected
+
+def test_none_missing_mixed_dtypes():
+    df = pd.DataFrame({'A': [1, 2, 3], 'B': [1., np.nan, 3.],
+                       'C': ['a', 'b', None], 'D': [True, False, True]})
+    ck.none_missing(df, columns=['A', 'D'])
+    with pytest.raises(AssertionError) as e:
+        ck.none_missing(df)
+    assert e.value.args == ((1, 'B'), (2, 'C'))
+
+def test_none_missing_duplicate_columns():
+    df = pd.DataFrame([[1, 2.], [2, 3.]], columns=['A', 'A'])
+    tm.assert_frame_equal(df, ck.none_missing(df))
+    tm.assert_frame_equal(df, dc.none_missing()(_noop)(df))
+    df.iloc[1, 1] = np.nan
+    for check in [ck.none_missing, dc.none_missing()(_noop)]:
+        with pytest.raises(AssertionError) as e:
+            check(df)
+        assert e.value.args == ((1, 'A'),)
+
+@pytest.mark.parametrize('values, kwargs, pos', [
+    ([1, 2, 3, 2, 5], {'increasing': True}, 3),
+    ([1, 2, 2, 3], {'increasing': True, 'strict': True}, 2),
+    ([3, 2, 2, 1], {'strict': True}, 2),
+    ([1, 2, 3, 2, 1], {}, 3),
+    ([1., 2., np.nan, 4.], {'increasing': True}, 2),
+    (['a', 'b', 'b', 'a'], {'increasing': True}, 3),
+    (['a', 'b', 'b'], {'increasing': True, 'strict': True}, 2),
+    (['a', None, 'c'], {'increasing': True}, 1),
+    (pd.to_datetime(['2015', '2016', '2016']), {'strict': True}, 2),
+    (pd.to_datetime(['2015', None, '2016']), {}, 1),
+    (pd.Categorical(['a', 'b', 'a']), {}, 2),
+    ([1, 2, 'a', 'b'], {'increasing': True}, 2),
+    (['a', 'b', 1], {}, 2),
+    ([1, 'a', 0], {'increasing': False}, 1),
+])
+def test_monotonic_reports_first_violation(values, kwargs, pos):
+    df = pd.DataFrame({'A': values})
+    with pytest.raises(AssertionError) as e:
+        ck.is_monotonic(df, **kwargs)
+    msg, bad = e.value.args
+    assert msg == "Column 'A' is not monotonic at position {}".format(pos)
+    assert bad.index.tolist() == [pos - 1, pos]
+
+@pytest.mark.parametrize('values', [
+    ['a', 'b', 'c'],
+    pd.to_datetime(['2015', '2016', '2017']),
+    pd.Categorical(['a', 'b', 'c']),
+])
+def test_monotonic_strict_non_numeric(values):
+    df = pd.DataFrame({'A': values})
+    tm.assert_frame_equal(df, ck.is_monotonic(df, increasing=True,
+                                              strict=True))
+    tm.assert_frame_equal(df, ck.is_monotonic(df, strict=True))
+
+@pytest.mark.parametrize('allowed, values', [
+    ([1, 2, 3], [1, 4, 2., np.nan]),
+    ([1, 2, np.nan], [1., np.nan, 5]),
+    ({1, 3}, [1, 2, 3]),
+    ([1.5], [1, 2]),
+    (['a', 'b'], ['a', 'c', None]),
+    (['a', None], ['a', 'c', None]),
+    ([1, 2], ['a', 1]),
+    ([True], [True, False]),
+    ([], [1, 2]),
+    (['a', 'b'], pd.Categorical(['a', 'c', None])),
+    (['a', np.nan], pd.Categorical(['a', 'c', None])),
+    (pd.to_datetime(['2015']), pd.to_datetime(['2015', '2016', None])),
+    (pd.date_range('2015', periods=2, tz='US/Eastern'),
+     pd.date_range('2015', periods=3, tz='US/Eastern')),
+])
+@pytest.mark.parametrize('large', [1, generic.ValueSet.large])
+def test_value_set_matches_isin(monkeypatch, allowed, values, large):
+    # large sets look values up in their own hash table
+    monkeypatch.setattr(generic.ValueSet, 'large', large)
+    s = pd.Series(values)
+    result = generic.ValueSet(allowed).contains(s)
+    assert result.tolist() == s.isin(allowed).tolist()
+
+def test_within_set_reports_bad_values():
+    df = pd.DataFrame({'A': pd.Categorical(['a', 'b', 'c', 'a'])})
+    allowed = generic.ValueSet(['a', 'b'])
+    tm.assert_frame_equal(df.iloc[:2], ck.within_set(df.iloc[:2],
+                                                     {'A': allowed}))
+    with pytest.raises(AssertionError) as e:
+        dc.within_set({'A': ['a', 'b']})(_noop)(df)
+    msg, bad = e.value.args
+    assert msg == 'Not in set'
+    assert bad.index.tolist() == [2]
+
+def test_within_set_rejects_strings():
+    df = pd.DataFrame({'x': ['a', 'b']})
+    for allowed in ['ab', b'ab']:
+        with pytest.raises(TypeError):
+            ck.within_set(df, {'x': allowed})
+
+def test_within_range_mixed_dtypes():
+    df = pd.DataFrame({'A': [1, 2, 3], 'B': [.5, np.nan, 1.5],
+                       'C': pd.to_datetime(['2015', '2016', '2017']),
+                       'D': ['a', 'b', None], 'E': [np.nan] * 3})
+    items = {'A': (1, 3), 'B': (0, 2),
+             'C': (pd.Timestamp('2015'), pd.Timestamp('2017')),
+             'E': (0, 1)}
+    tm.assert_frame_equal(df, ck.within_range(df, items))
+
+    cases = [('A', (2, 3), [True, False, False]),
+             ('B', (0, 1), [False, False, True]),
+             ('C', (pd.Timestamp('2016'), pd.Timestamp('2017')),
+              [True, False, False])]
+    for k, bounds, expected in cases:
+        with pytest.raises(AssertionError) as e:
+            ck.within_range(df, dict(items, **{k: bounds}))
+        msg, bad = e.value.args
+        assert msg == 'Outside range'
+        assert bad.name == k
+        assert bad.tolist() == expected
+
+def test_within_n_std_fitted():
+    from engarde.streaming import RunningStats
+    ref = pd.DataFrame({'A': np.arange(10.), 'B': list('abcde') * 2})
+    stats = RunningStats.fit(ref)
+    assert list(stats.mean.index) == ['A']
+
+    df = pd.DataFrame({'A': [4., 5., 6.], 'B': list('xyz')})
+    tm.assert_frame_equal(df, ck.within_n_std(df, 1, stats=stats))
+    tm.assert_frame_equal(df, dc.within_n_std(1, stats=stats)(_noop)(df))
+
+    # a batch of outliers doesn't widen its own thresholds
+    df = pd.DataFrame({'A': [50., 60.]})
+    ck.within_n_std(df, 1)
+    with pytest.raises(AssertionError) as e:
+        ck.within_n_std(df, 1, stats=stats)
+    assert list(e.value.args[0]) == [(0, 'A'), (1, 'A')]
+
+    with pytest.raises(AssertionError):
+        ck.within_n_std(pd.DataFrame({'A': [4., np.nan]}), stats=stats)
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+import pytest
+import numpy as np
+import pandas as pd
+import pandas.util.testing as tm
+
+import engarde.checks as ck
+import engarde.decorators as dc
+from engarde import config
+from engarde.config import options, set_options
+from engarde.plan import CheckPlan
+
+
+def _noop(df):
+    return df
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({'A': [1, np.nan]})
+
+def test_levels(df):
+    f = dc.is_shape((2, 1))(dc.none_missing()(_noop))
+    g = dc.is_shape((3, 1))(_noop)
+    with pytest.raises(AssertionError):
+        f(df)
+
+    with set_options(level='cheap'):
+        tm.assert_frame_equal(f(df), df)
+        with pytest.raises(AssertionError):
+            g(df)
+
+    with set_options(level='off'):
+        tm.assert_frame_equal(g(df), df)
+        assert options['level'] == 'off'
+    assert options['level'] == 'all'
+
+    with pytest.raises(AssertionError):
+        f(df)
+
+def test_set_options_for_good(df):
+    f = dc.none_missing()(_noop)
+    set_options(level='off')
+    try:
+        tm.assert_frame_equal(f(df), df)
+    finally:
+        set_options(level='all')
+    with pytest.raises(AssertionError):
+        f(df)
+
+def test_disabled(df):
+    f = dc.unique()(dc.none_missing()(_noop))
+    with set_options(disabled=['none_missing']):
+        tm.assert_frame_equal(f(df), df)
+        CheckPlan().add(ck.none_missing).validate(df)
+        with pytest.raises(AssertionError):
+            f(pd.DataFrame({'A': [1, 1]}))
+    with pytest.raises(AssertionError):
+        f(df)
+
+def test_invalid_options():
+    with pytest.raises(ValueError):
+        set_options(level='some')
+    with pytest.raises(KeyError):
+        set_options(colour='red')
+    assert options['level'] == 'all'
+
+def test_env_bypass(monkeypatch):
+    monkeypatch.setenv('ENGARDE_LEVEL', 'off')
+    assert dc.none_missing()(_noop) is _noop
+
+@pytest.mark.parametrize('env, level', [
+    ('cheap', 'cheap'), ('cheap-only', 'cheap'), (' OFF', 'off'),
+])
+def test_env_level(monkeypatch, env, level):
+    monkeypatch.setenv('ENGARDE_LEVEL', env)
+    assert config._env_level() == level
+
+def test_env_level_unknown(monkeypatch):
+    monkeypatch.setenv('ENGARDE_LEVEL', 'most')
+    with pytest.warns(RuntimeWarning):
+        assert config._env_level() == 'all'
+
+def test_at_level():
+    plan = CheckPlan().add(ck.is_shape, (1, 1)).add(ck.none_missing)
+    assert len(plan.at_level('all')) == 2
+    assert len(plan.at_level('cheap')) == 1
+    assert len(plan.at_level('off')) == 0
+    with pytest.raises(ValueError):
+        plan.at_level('most')
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+import pytest
+import numpy as np
+import pandas as pd
+
+import engarde.checks as ck
+from engarde.diff import diff_frames, numeric_errors
+
+
+def test_diff_frames():
+    df = pd.DataFrame({'A': [1., 2, np.nan, 4], 'B': list('abcd'),
+                       'C': pd.Categorical(list('xyxy')),
+                       'D': pd.date_range('2000', periods=4)})
+    other = df.copy()
+    other.loc[1, 'A'] = 5
+    other.loc[3, 'B'] = 'z'
+    other.loc[3, 'D'] = pd.NaT
+    other.loc[3, 'C'] = 'x'
+
+    diff = diff_frames(df, other, n_rows=1, block_size=2)
+    assert not diff.equal
+    assert diff.counts.to_dict() == {'A': 1, 'B': 1, 'C': 1, 'D': 1}
+    assert diff.n_rows == 2
+    assert diff.rows.index.tolist() == [1]
+    assert diff.rows[('A', 'right')].tolist() == [5]
+
+    diff = diff_frames(df, df.copy())
+    assert diff.equal and diff.columns == []
+    assert repr(diff) == 'no differences'
+
+def test_diff_frames_structure():
+    df = pd.DataFrame({'A': [1., 2, 3], 'B': [1, 2, 3]})
+    other = df.drop(columns='B').assign(C=0, A=df.A.astype('float32'))
+    diff = diff_frames(df, other.iloc[:2])
+    assert diff.shapes == ((3, 2), (2, 2))
+    assert diff.only_left == ['B'] and diff.only_right == ['C']
+    assert list(diff.dtypes) == ['A']
+    assert diff.index_differs
+    assert diff.columns == []
+
+def test_diff_frames_tolerance():
+    df = pd.DataFrame({'A': [1., 2, 3], 'B': [1, 2, 3]})
+    other = df.assign(A=df.A + 1e-9, B=df.B.astype(float))
+    assert diff_frames(df, other).columns == ['A']
+    assert diff_frames(df, other, rtol=1e-5).equal
+
+def test_is_same_as_diff():
+    df = pd.DataFrame({'A': np.arange(1000.), 'B': np.arange(1000)})
+    other = df.copy()
+    other.loc[[10, 500], 'A'] = -1
+    with pytest.raises(AssertionError) as exc:
+        ck.is_same_as(df, other)
+    message, diff = exc.value.args
+    assert message == "DataFrames are not equal"
+    assert diff.counts.to_dict() == {'A': 2}
+    assert diff.rows.index.tolist() == [10, 500]
+
+def test_diff_frames_numeric_edges():
+    df = pd.DataFrame({'A': [True, False], 'B': [np.inf, 1.],
+                       'C': [np.iinfo('int64').max, 0]})
+    other = pd.DataFrame({'A': [True, True], 'B': [-np.inf, 1.],
+                          'C': [np.iinfo('int64').min, 0]})
+    diff = diff_frames(df, other, rtol=1e-5, atol=1e-8)
+    assert diff.counts.to_dict() == {'A': 1, 'B': 1, 'C': 1}
+
+def test_is_same_as_duplicate_columns():
+    df = pd.DataFrame([[1, 2], [3, 4]], columns=['A', 'A'])
+    other = pd.DataFrame([[1, 2], [3, 5]], columns=['A', 'A'])
+    ck.is_same_as(df, df.copy())
+    with pytest.raises(AssertionError):
+        ck.is_same_as(df, other)
+
+def test_diff_frames_ranges():
+    df = pd.DataFrame({'A': np.arange(10.)})
+    other = df.copy()
+    other.loc[[1, 5, 8], 'A'] = -1
+    diff = diff_frames(df, other, block_size=2, ranges=[(0, 3), (7, 20)])
+    assert diff.counts.to_dict() == {'A': 2}
+    assert diff.rows.index.tolist() == [1, 8]
+
+def test_is_same_as_mixed_column_labels():
+    df = pd.DataFrame({0: [1, 2], 'a': [3., 4.]})
+    other = df.copy()
+    other.loc[1, 'a'] = 5
+    other.loc[0, 0] = 0
+    with pytest.raises(AssertionError) as exc:
+        ck.is_same_as(df, other)
+    assert exc.value.args[1].columns == [0, 'a']
+
+def test_diff_frames_series():
+    s = pd.Series([1., 2, 3], name='A')
+    diff = diff_frames(s, s.where(s < 3, 5))
+    assert diff.counts.to_dict() == {'A': 1}
+    assert diff.rows.index.tolist() == [2]
+    assert diff_frames(s, s.copy()).equal
+    with pytest.raises(AssertionError):
+        ck.is_same_as(s, s + 1)
+
+def test_diff_frames_multiindex_columns():
+    columns = pd.MultiIndex.from_product([['a', 'b'], ['x', 'y']])
+    df = pd.DataFrame(np.arange(8).reshape(2, 4), columns=columns)
+    other = df.copy()
+    other.iloc[1, 3] = -1
+    diff = diff_frames(df, other)
+    assert diff.counts.to_dict() == {('b', 'y'): 1}
+    assert diff.rows[(('b', 'y'), 'right')].tolist() == [-1]
+    with pytest.raises(AssertionError) as exc:
+        ck.is_same_as(df, other)
+    assert exc.value.args[1].columns == [('b', 'y')]
+    # the fallback to assert_frame_equal, on frames with another index
+    with pytest.raises(AssertionError):
+        ck.is_same_as(df, other.set_index(other.index + 1))
+
+def test_is_same_as_unhashable():
+    df = pd.DataFrame({'A': [[1], [2, 3], []], 'B': [{'x': 1}, {}, None]})
+    assert ck.is_same_as(df, df.copy()) is df
+    other = df.copy()
+    other.at[1, 'A'] = [2, 4]
+    with pytest.raises(AssertionError) as exc:
+        ck.is_same_as(df, other)
+    assert exc.value.args[1].counts.to_dict() == {'A': 1}
+
+def test_numeric_errors_wide():
+    df = pd.DataFrame(np.random.RandomState(0).randn(50, 40))
+    other = df.copy()
+    other.iloc[7, 3] += 1
+    other.iloc[9, 35] = np.nan
+    other[20] += 1e-9
+    for n_jobs in [1, 3]:
+        errors, worst = numeric_errors(df, other, n_jobs=n_jobs)
+        assert errors['not_close'][errors['not_close'] > 0].to_dict() == {
+            3: 1, 35: 1}
+        assert errors.loc[20, 'max_abs_error'] > 0
+        assert worst.index.tolist() == [9, 7]
+        assert list(worst.columns.levels[0]) == [3, 35]
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+
+from engarde.fingerprint import column_fingerprints, fingerprint
+
+
+def _frame():
+    return pd.DataFrame({'A': [1, 2, 3], 'B': [1., np.nan, 3.],
+                         'C': ['x', None, 'z'],
+                         'D': pd.Categorical(['a', 'b', 'a']),
+                         'E': pd.date_range('2015', periods=3)})
+
+def test_same_contents_same_fingerprint():
+    df = _frame()
+    assert fingerprint(df) == fingerprint(_frame()) == fingerprint(df.copy())
+    assert len(fingerprint(df)) == 40
+    assert fingerprint(df, n_jobs=3) == fingerprint(df)
+
+def test_changes_change_fingerprint():
+    df = _frame()
+    changed = [df.assign(A=[1, 2, 4]),
+               df.assign(A=df.A.astype(float)),
+               df.assign(C=['x', 'y', 'z']),
+               df.rename(columns={'A': 'Z'}),
+               df[['B', 'A', 'C', 'D', 'E']],
+               df.iloc[::-1],
+               df.iloc[:2],
+               df.set_index(df.index + 1)]
+    prints = {fingerprint(d) for d in changed}
+    assert len(prints) == len(changed)
+    assert fingerprint(df) not in prints
+
+def test_index_optional():
+    df = _frame()
+    moved = df.set_index(df.index + 1)
+    assert fingerprint(moved, index=False) == fingerprint(df, index=False)
+    assert fingerprint(moved) != fingerprint(df)
+
+def test_column_fingerprints():
+    df = _frame()
+    digests = column_fingerprints(df)
+    assert len(digests) == 5
+    assert column_fingerprints(df.assign(B=0.))[::2] == digests[::2]
+    assert column_fingerprints(df, n_jobs=2) == digests
+
+def test_no_collisions():
+    frames = [pd.DataFrame({'A': [1, 'x']}),
+              pd.DataFrame({'A': ['1', 'x']}),
+              pd.DataFrame({1: [1, 2]}),
+              pd.DataFrame({'1': [1, 2]}),
+              pd.DataFrame({'A': pd.Categorical(['a', 'b'])}),
+              pd.DataFrame({'A': pd.Categorical(['a', 'b'],
+                                                categories=['b', 'a'])}),
+              pd.DataFrame({'A': pd.Categorical(['a', 'b'],
+                                                categories=['a', 'b', 'c'])}),
+              pd.DataFrame({'A': pd.Categorical(['a', 'b'], ordered=True)})]
+    prints = {fingerprint(df) for df in frames}
+    assert len(prints) == len(frames)
+    assert (fingerprint(pd.DataFrame({'A': ['a', None]})) ==
+            fingerprint(pd.DataFrame({'A': ['a', None]})))
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+Import cost, measured in fresh interpreters.
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(__file__), os.pardir)
+
+# seconds importing engarde.decorators may add to importing pandas
+BUDGET = 0.25
+
+# only needed by some checks or options, and imported on first use
+LAZY = ['pandas.util.testing', 'pandas.testing', 'sqlite3',
+        'multiprocessing.pool', 'engarde.store', 'engarde.fingerprint',
+        'engarde.parallel', 'engarde.streaming', 'numexpr']
+
+
+def _run(code):
+    return subprocess.check_output([sys.executable, '-c', code], cwd=ROOT)
+
+def test_heavy_modules_load_lazily():
+    code = ("import sys, pandas\n"
+            "before = set(sys.modules)\n"
+            "import engarde.decorators\n"
+            "print(' '.join(set(sys.modules) - before))")
+    loaded = _run(code).decode('utf-8').split()
+    assert 'engarde.checks' in loaded
+    assert not set(LAZY) & set(loaded)
+
+def test_import_budget():
+    code = ("import timeit, pandas\n"
+            "start = timeit.default_timer()\n"
+            "import engarde.decorators\n"
+            "print(timeit.default_timer() - start)")
+    _run(code)  # compile the bytecode first
+    assert float(_run(code)) < BUDGET
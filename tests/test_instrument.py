@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import logging
+
+import pytest
+import numpy as np
+import pandas as pd
+
+import engarde.checks as ck
+import engarde.decorators as dc
+from engarde import instrument
+from engarde.plan import CheckPlan
+
+
+@dc.within_range({'A': (0, 10)})
+@dc.none_missing()
+def _checked(df):
+    return df
+
+def test_recording():
+    df = pd.DataFrame({'A': [1., 2, 3]})
+    with instrument.recording() as records:
+        _checked(df)
+        with pytest.raises(AssertionError):
+            _checked(df * 10)
+    _checked(df)
+    assert len(records) == 4
+    first = records.records[0]
+    assert first.label == 'tests.test_instrument._checked'
+    assert first.check == 'none_missing'
+    assert (first.rows, first.columns) == (3, 1)
+    assert first.passed
+    assert first.seconds >= 0
+    assert not records.records[-1].passed
+    assert instrument.sinks == []
+
+def test_report():
+    df = pd.DataFrame({'A': [1., 2, 3]})
+    with instrument.recording() as records:
+        for _ in range(3):
+            _checked(df)
+        CheckPlan().add(ck.unique).validate(df)
+        with pytest.raises(AssertionError):
+            _checked(df * 10)
+    summary = records.report()
+    assert list(summary.columns) == ['calls', 'failures', 'rows', 'total',
+                                     'mean', 'max']
+    row = summary.loc[('tests.test_instrument._checked', 'within_range')]
+    assert row['calls'] == 4
+    assert row['failures'] == 1
+    assert row['rows'] == 12
+    assert summary.loc[('-', 'unique'), 'calls'] == 1
+
+def test_callback_and_logging_sinks(caplog):
+    seen = []
+    sinks = [instrument.add_sink(seen.append),
+             instrument.add_sink(instrument.LoggingSink())]
+    try:
+        with caplog.at_level(logging.DEBUG, logger='engarde'):
+            _checked(pd.DataFrame({'A': [1, 2]}))
+    finally:
+        for sink in sinks:
+            instrument.remove_sink(sink)
+    assert [r.check for r in seen] == ['none_missing', 'within_range']
+    assert 'within_range on 2x1 passed' in caplog.text
+
+def test_parallel_records():
+    df = pd.DataFrame({'A': np.arange(10), 'B': np.arange(10)})
+    plan = CheckPlan().add(ck.unique)
+    with instrument.recording() as records:
+        plan.validate(df, engine='threads', n_jobs=2)
+    assert len(records) == 2
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+import pytest
+import numpy as np
+import pandas as pd
+import pandas.util.testing as tm
+
+import engarde.checks as ck
+from engarde.plan import CheckPlan, Step
+from engarde.store import ResultStore
+
+
+def _plan():
+    return (CheckPlan()
+            .add(ck.none_missing)
+            .add(ck.unique, ['A', 'B'])
+            .add(ck.within_range, {'A': (0, 100), 'C': (-10, 10)})
+            .add(ck.within_set, {'D': ['a', 'b']})
+            .add(ck.is_monotonic, {'A': (True, True)})
+            .add(ck.is_shape, (-1, 4)))
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({'A': np.arange(50), 'B': np.arange(50.) * 2,
+                         'C': np.random.uniform(-10, 10, 50),
+                         'D': list('ab') * 25})
+
+@pytest.mark.parametrize('engine', ['threads', 'processes'])
+@pytest.mark.parametrize('n_jobs', [1, 3, 8])
+def test_parallel_passes(df, engine, n_jobs):
+    result = _plan().validate(df, engine=engine, n_jobs=n_jobs)
+    tm.assert_frame_equal(result, df)
+
+@pytest.mark.parametrize('engine', ['threads', 'processes'])
+def test_parallel_raises_first_failing_check(df, engine):
+    df.loc[3, 'B'] = 0
+    df.loc[5, 'D'] = 'c'
+    with pytest.raises(AssertionError, match='non-unique'):
+        _plan().validate(df, engine=engine, n_jobs=2)
+
+def test_parallel_merges_row_blocks():
+    df = pd.DataFrame({'A': np.arange(100)})
+    plan = CheckPlan().add(ck.within_range, {'A': (10, 89)})
+    with pytest.raises(AssertionError) as e:
+        plan.validate(df, engine='threads', n_jobs=4)
+    msg, bad = e.value.args
+    assert msg == 'Outside range'
+    assert bad[bad].index.tolist() == list(range(10)) + list(range(90, 100))
+
+@pytest.mark.parametrize('check, items', [
+    (ck.within_range, {'A': (10, 89)}),
+    (ck.within_range, {'A': (-1, 89), 'B': (10, 100)}),
+    (ck.within_set, {'A': range(90), 'B': range(10, 100)}),
+])
+def test_parallel_row_blocks_match_serial(check, items):
+    df = pd.DataFrame({'A': np.arange(100), 'B': np.arange(100)})
+    with pytest.raises(AssertionError) as serial:
+        check(df, items)
+    with pytest.raises(AssertionError) as e:
+        CheckPlan().add(check, items).validate(df, engine='threads',
+                                               n_jobs=4)
+    assert e.value.args[0] == serial.value.args[0]
+    tm.assert_series_equal(e.value.args[1], serial.value.args[1])
+
+def test_parallel_merges_columns():
+    df = pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6], 'C': [7, 8, 9]})
+    plan = CheckPlan().add(ck.within_set, {'A': [1, 2], 'C': [7, 8]})
+    with pytest.raises(AssertionError) as e:
+        plan.validate(df, engine='threads', n_jobs=2)
+    msg, bad = e.value.args
+    assert msg == 'Not in set'
+    assert list(bad.columns) == ['A', 'C']
+
+def test_parallel_unknown_engine(df):
+    with pytest.raises(ValueError):
+        _plan().validate(df, engine='gpu')
+
+@pytest.mark.parametrize('engine', ['threads', 'processes'])
+def test_parallel_store(tmpdir, engine):
+    store = ResultStore(str(tmpdir.join('results.sqlite')))
+    df = pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]})
+    plan = CheckPlan([Step(ck.unique, kwargs={'columns': ['A', 'B']},
+                           store=store),
+                      Step(ck.within_set, ({'A': [1, 2]},), store=store)])
+    for _ in range(2):
+        with pytest.raises(AssertionError, match='Not in set'):
+            plan.validate(df, engine=engine, n_jobs=2)
+    results = store.results().sort_values('check_name')
+    assert results['check_name'].tolist() == ['engarde.checks.unique',
+                                              'engarde.checks.within_set']
+    assert results['passed'].tolist() == [1, 0]
+    assert results['summary'].iloc[1].startswith('Not in set')
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import pytest
+import numpy as np
+import pandas as pd
+import pandas.util.testing as tm
+
+import engarde.checks as ck
+import engarde.decorators as dc
+from engarde.plan import CheckPlan, FrameStats
+
+
+def _noop(df):
+    return df
+
+def test_plan_passes():
+    df = pd.DataFrame({'A': [1, 2, 3], 'B': ['a', 'b', 'c']})
+    plan = (CheckPlan()
+            .add(ck.none_missing)
+            .add(ck.unique, columns=['A'])
+            .add(ck.within_range, {'A': (0, 3)})
+            .add(ck.within_set, {'B': ['a', 'b', 'c']})
+            .add(ck.is_shape, (3, 2)))
+    assert len(plan) == 5
+    tm.assert_frame_equal(df, plan.validate(df))
+    tm.assert_frame_equal(df, df.pipe(plan))
+
+def test_plan_is_immutable():
+    plan = CheckPlan().add(ck.none_missing)
+    plan.add(ck.unique)
+    assert len(plan) == 1
+    assert len(plan.extend(plan)) == 2
+
+@pytest.mark.parametrize('check, args', [
+    (ck.none_missing, ()),
+    (ck.unique, ()),
+    (ck.within_range, ({'A': (2, 3)},)),
+    (ck.within_set, ({'A': [1, 2]},)),
+])
+def test_plan_raises_check_error(check, args):
+    df = pd.DataFrame({'A': [1, 1, np.nan]})
+    with pytest.raises(AssertionError) as expected:
+        check(df, *args)
+    with pytest.raises(AssertionError) as result:
+        CheckPlan().add(check, *args).validate(df)
+    assert str(result.value) == str(expected.value)
+
+def test_plan_runs_in_order():
+    df = pd.DataFrame({'A': [1, 1]})
+    plan = CheckPlan().add(ck.is_shape, (1, 1)).add(ck.unique)
+    with pytest.raises(AssertionError, match='Expected shape'):
+        plan.validate(df)
+
+def test_frame_stats_shared():
+    df = pd.DataFrame({'A': [1, np.nan, 3]})
+    stats = FrameStats(df)
+    assert stats.isnull('A') is stats.isnull('A')
+    assert stats.has_nulls('A')
+    assert stats.min('A') == 1
+    assert stats.max('A') == 3
+
+def test_stacked_decorators_share_plan():
+    calls = []
+
+    @dc.within_range({'A': (0, 10)})
+    @dc.unique()
+    @dc.none_missing()
+    def f(df):
+        calls.append(1)
+        return df
+
+    inner, plan = dc._PLANS[f]
+    assert len(plan) == 3
+    assert [step.check for step in plan.steps] == [
+        ck.none_missing, ck.unique, ck.within_range]
+    assert f.__name__ == 'f'
+
+    df = pd.DataFrame({'A': [1, 2, 3]})
+    tm.assert_frame_equal(df, f(df))
+    assert len(calls) == 1
+
+    with pytest.raises(AssertionError):
+        f(pd.DataFrame({'A': [1, 1, 3]}))
+    with pytest.raises(AssertionError):
+        f(pd.DataFrame({'A': [1, 2, 30]}))
+
+def test_stacked_decorators_respect_foreign_wrappers():
+    from functools import wraps
+    calls = []
+
+    def logged(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            calls.append(1)
+            return func(*args, **kwargs)
+        return wrapper
+
+    f = dc.unique()(logged(dc.none_missing()(_noop)))
+    f(pd.DataFrame({'A': [1, 2]}))
+    assert calls == [1]
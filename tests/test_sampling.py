@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+import pytest
+import numpy as np
+import pandas as pd
+import pandas.util.testing as tm
+
+import engarde.checks as ck
+import engarde.decorators as dc
+from engarde.plan import CheckPlan, Step
+from engarde.sampling import Sample
+
+
+def _noop(df):
+    return df
+
+def test_every():
+    df = pd.DataFrame({'A': [1, np.nan]})
+    f = dc.none_missing(sample=Sample(every=3))(_noop)
+    for i in range(7):
+        if i % 3:
+            tm.assert_frame_equal(f(df), df)
+        else:
+            with pytest.raises(AssertionError):
+                f(df)
+
+def test_fraction_is_reproducible():
+    def checked(seed):
+        sample = Sample(fraction=.3, seed=seed)
+        return [sample.should_check() for _ in range(200)]
+    result = checked(0)
+    assert result == checked(0)
+    assert 30 < sum(result) < 90
+    assert not any(Sample(fraction=0).should_check() for _ in range(10))
+
+def test_rows():
+    df = pd.DataFrame({'A': np.arange(1000)})
+    sample = Sample(rows=100, seed=1)
+    taken = sample.take(df)
+    assert 90 < len(taken) <= 100
+    assert taken['A'].is_monotonic_increasing
+    assert taken.index.isin(df.index).all()
+
+    assert len(Sample(rows=.5, seed=1).take(df)) > 400
+    assert Sample(rows=5000).take(df) is df
+
+def test_rows_skip_whole_frame_checks():
+    df = pd.DataFrame({'A': np.arange(1000)})
+    sample = Sample(rows=10, seed=0)
+    f = dc.is_shape((1000, 1), sample=sample)(
+        dc.is_monotonic(strict=True, sample=sample)(_noop))
+    tm.assert_frame_equal(f(df), df)
+
+def test_rows_skip_is_close_to():
+    df = pd.DataFrame({'A': np.arange(1000.)})
+    f = dc.is_close_to(df * (1 + 1e-7), sample=Sample(rows=10, seed=0))(
+        _noop)
+    tm.assert_frame_equal(f(df), df)
+    with pytest.raises(AssertionError):
+        f(df + 1)
+
+def test_rows_skip_whole_frame_predicates():
+    df = pd.DataFrame({'A': np.arange(1000.)})
+    sample = Sample(rows=10, seed=0)
+    for _ in range(20):
+        dc.verify_any(lambda d: d['A'] == 0, sample=sample)(_noop)(df)
+        dc.verify(lambda d: len(d) == 1000, sample=sample)(_noop)(df)
+        dc.within_n_std(2, sample=sample)(_noop)(df)
+
+def test_rows_catch_bad_data_in_aggregate():
+    df = pd.DataFrame({'A': np.arange(1000.)})
+    df.iloc[::2] = np.nan
+    f = dc.none_missing(sample=Sample(rows=10, seed=0))(_noop)
+    with pytest.raises(AssertionError):
+        f(df)
+
+def test_shared_policy_drawn_once_per_call():
+    sample = Sample(every=2)
+    plan = CheckPlan([Step(ck.none_missing, sample=sample),
+                      Step(ck.unique, sample=sample)])
+    df = pd.DataFrame({'A': [1, 1]})
+    with pytest.raises(AssertionError):
+        plan.validate(df)
+    plan.validate(df)
+    with pytest.raises(AssertionError):
+        plan.validate(df)
+
+def test_verify_and_is_same_as_take_sample():
+    df = pd.DataFrame({'A': [1, 2, 3]})
+    f = dc.verify_all(lambda x: x > 5, sample=Sample(every=2))(_noop)
+    with pytest.raises(AssertionError):
+        f(df)
+    f(df)
+
+    f = dc.is_same_as(df + 1, sample=Sample(every=2))(_noop)
+    with pytest.raises(AssertionError):
+        f(df)
+    f(df)
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        Sample(every=0)
+    with pytest.raises(ValueError):
+        Sample(fraction=2)
+    for rows in [-1, 0, 0., 1.5]:
+        with pytest.raises(ValueError):
+            Sample(rows=rows)
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import pytest
+import numpy as np
+import pandas as pd
+import pandas.util.testing as tm
+
+import engarde.checks as ck
+import engarde.decorators as dc
+from engarde.config import set_options
+from engarde.schema import Schema
+
+
+def _noop(df):
+    return df
+
+def _frame():
+    return pd.DataFrame({'id': [1, 2, 3], 'price': [1.5, 2., np.nan],
+                         'kind': pd.Categorical(['buy', 'sell', 'buy']),
+                         'time': pd.date_range('2000', periods=3)})
+
+SCHEMA = Schema({
+    'id': {'dtype': 'int64', 'nullable': False, 'unique': True},
+    'price': {'dtype': float, 'range': (0, 10)},
+    'kind': {'dtype': 'category', 'allowed': {'buy', 'sell'}},
+    'time': {'monotonic': (True, True)},
+})
+
+
+def test_schema_compiles():
+    checks = [step.check for step in SCHEMA.plan.steps]
+    assert checks == [ck.has_columns, ck.has_dtypes, ck.none_missing,
+                      ck.within_set, ck.within_range, ck.unique,
+                      ck.is_monotonic]
+    assert SCHEMA.dtypes['price'] == np.dtype('float64')
+    with pytest.raises(ValueError):
+        Schema({'A': {'dtpye': 'int64'}})
+    with pytest.raises(TypeError):
+        Schema({'A': {'dtype': 'not a dtype'}})
+
+def test_schema():
+    df = _frame()
+    tm.assert_frame_equal(df, SCHEMA(df))
+    tm.assert_frame_equal(df, SCHEMA.validate(df))
+    tm.assert_frame_equal(df, df.pipe(SCHEMA))
+    tm.assert_frame_equal(df, SCHEMA(_noop)(df))
+
+    bad = [df.drop(columns='time'), df.assign(id=[1., 2., 3.]),
+           df.assign(id=[1, 1, 3]), df.assign(price=[1., 11., 2.]),
+           df.assign(time=df.time[::-1].values),
+           df.assign(kind=['buy', 'sell', 'hold'])]
+    for frame in bad:
+        with pytest.raises(AssertionError):
+            SCHEMA(frame)
+        with pytest.raises(AssertionError):
+            SCHEMA(_noop)(frame)
+
+def test_schema_rejects_non_frames():
+    df = _frame()
+    for obj in [df['id'], df.values, None]:
+        with pytest.raises(TypeError):
+            SCHEMA(obj)
+
+def test_schema_stacked():
+    df = _frame()
+    f = dc.is_shape((3, 4))(SCHEMA(dc.none_missing(['id'])(_noop)))
+    tm.assert_frame_equal(df, f(df))
+    with pytest.raises(AssertionError):
+        f(df.assign(price=[1., 11., 2.]))
+
+    with set_options(level='cheap'):
+        f(df.assign(price=[1., 11., 2.]))
+        with pytest.raises(AssertionError):
+            f(df.drop(columns='time'))
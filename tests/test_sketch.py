@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import pytest
+import numpy as np
+import pandas as pd
+
+from engarde.sketch import BloomFilter, HyperLogLog, hash_values
+
+
+def test_hash_values():
+    s = pd.Series(['a', None, 'b', 'a', None])
+    hashes = hash_values(s)
+    assert hashes.dtype == np.uint64
+    assert hashes[0] == hashes[3] and hashes[1] == hashes[4]
+    assert (hash_values(pd.Index([1, 2])) ==
+            hash_values(pd.Series([1, 2]))).all()
+    # values hash the same whatever the numeric dtype of their chunk
+    expected = hash_values(pd.Series([3, 0, -2]))
+    for dtype in ['float64', 'int8', 'Int64']:
+        other = pd.Series([3, -0., -2], dtype=dtype)
+        assert (hash_values(other) == expected).all()
+    assert hash_values(pd.Series([np.nan]))[0] == hash_values(
+        pd.Series([None], dtype='Int64'))[0]
+
+def test_bloom_filter():
+    hashes = hash_values(pd.Series(np.arange(20000)))
+    bloom = BloomFilter(10000, error_rate=.01)
+    assert not bloom.add(hashes[:5000]).any()
+    assert bloom.add(hashes[:10]).all()
+    # no false negatives, and about the false positive rate asked for
+    assert bloom.add(hashes[:5000]).all()
+    assert bloom.add(hashes[5000:10000]).mean() < .02
+
+    repeated = bloom.add(hash_values(pd.Series([-1, -2, -1])))
+    assert repeated.tolist() == [False, False, True]
+
+    with pytest.raises(ValueError):
+        BloomFilter(10, error_rate=1)
+
+def test_hyperloglog():
+    hll = HyperLogLog(precision=12)
+    assert hll.count() == 0
+    hashes = hash_values(pd.Series(np.arange(100000)))
+    hll.add(hashes[:50000])
+    assert abs(hll.count() - 50000) < 2500
+    other = HyperLogLog(precision=12).add(hashes[25000:]).add(hashes[:10])
+    assert abs(hll.merge(other).count() - 100000) < 5000
+    assert HyperLogLog().add(hashes[:100]).count() == 100
+
+    with pytest.raises(ValueError):
+        hll.merge(HyperLogLog())
+    with pytest.raises(ValueError):
+        HyperLogLog(precision=30)
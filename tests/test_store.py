@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+import types
+
+import pytest
+import numpy as np
+import pandas as pd
+import pandas.util.testing as tm
+
+import engarde.checks as ck
+import engarde.decorators as dc
+from engarde.plan import CheckPlan, Step
+from engarde.store import ResultStore
+
+
+# arguments the counting check was called with; a global, so that the
+# check is identified by its code alone
+CALLS = []
+
+
+def _counting():
+    del CALLS[:]
+    return _count
+
+
+def _count(df, n):
+    CALLS.append(n)
+    if (df < n).any().any():
+        raise AssertionError('below {}'.format(n))
+    return df
+
+def _validate(check, df, store, *args):
+    CheckPlan([Step(check, args, store=store)]).validate(df)
+
+def test_known_passes_are_skipped(tmpdir):
+    path = str(tmpdir.join('results.sqlite'))
+    check = _counting()
+    df = pd.DataFrame({'A': [1, 2]})
+    _validate(check, df, ResultStore(path), 0)
+    # in another run, on equal data
+    store = ResultStore(path)
+    _validate(check, df.copy(), store, 0)
+    assert CALLS == [0]
+    _validate(check, df, store, -1)
+    _validate(check, df.assign(A=[1, 3]), store, 0)
+    assert CALLS == [0, -1, 0]
+
+    results = store.results()
+    assert len(results) == 3
+    assert results['passed'].all()
+
+def test_failures_run_again(tmpdir):
+    store = ResultStore(str(tmpdir.join('results.sqlite')))
+    check = _counting()
+    df = pd.DataFrame({'A': [1, 2]})
+    for _ in range(2):
+        with pytest.raises(AssertionError) as e:
+            _validate(check, df, store, 2)
+        assert e.value.args == ('below 2',)
+    assert CALLS == [2, 2]
+    results = store.results()
+    assert results['summary'].tolist() == ['below 2']
+    assert not results['passed'].any()
+
+def test_decorator_flag(tmpdir):
+    path = str(tmpdir.join('results.sqlite'))
+    df = pd.DataFrame({'A': [1, 2], 'B': ['x', 'y']})
+    f = dc.within_set({'B': ['x', 'y']}, store=path)(
+        dc.none_missing(store=path)(lambda: df))
+    tm.assert_frame_equal(f(), df)
+    f()
+    results = ResultStore(path).results()
+    assert sorted(results['check_name']) == ['engarde.checks.none_missing',
+                                             'engarde.checks.within_set']
+
+def test_arguments_identified_by_contents():
+    store = ResultStore(':memory:')
+    df = pd.DataFrame({'A': [1, 2]})
+    fp = 'abc'
+    key = lambda *args, **kwargs: store.key(
+        Step(ck.within_set, args, kwargs), fp)
+    assert key({'A': [1, 2], 'B': {'x'}}) == key({'B': {'x'}, 'A': (1, 2)})
+    assert key({'A': [1, 2]}) != key({'A': [1, 3]})
+    assert key(n=np.int64(3)) == key(n=3)
+    assert key(df) == key(df.copy()) != key(df + 1)
+    assert key(ck.none_missing) is not None
+    assert key(lambda df: df) == key(lambda df: df) != key(lambda df: df + 1)
+    assert key(object()) is None
+
+def test_functions_identified_by_code():
+    store = ResultStore(':memory:')
+    key = lambda check, *args: store.key(Step(check, args), 'abc')
+
+    def positive(df):
+        return df > 0
+
+    def edited(df):
+        return df > 1
+    edited.__name__ = edited.__qualname__ = positive.__qualname__
+    assert key(ck.verify_all, positive) != key(ck.verify_all, edited)
+
+    def make(n):
+        def above(df):
+            return df > n
+        return above
+    assert key(ck.verify_all, make(1)) == key(ck.verify_all, make(1))
+    assert key(ck.verify_all, make(1)) != key(ck.verify_all, make(2))
+
+    def check(df):
+        return df
+    other = types.FunctionType(check.__code__, {}, 'check')
+    other.__module__ = 'elsewhere'
+    assert key(check) != key(other)
+    assert key(check)[1].endswith('test_functions_identified_by_code.'
+                                  '<locals>.check')
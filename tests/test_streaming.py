@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+import copy
+import os
+
+import pytest
+import numpy as np
+import pandas as pd
+import pandas.util.testing as tm
+
+import engarde.checks as ck
+from engarde.plan import CheckPlan
+from engarde.streaming import (RunningStats, StreamValidator, approx_unique,
+                               validate_appended, validate_chunks)
+
+TRAINS = os.path.join(os.path.dirname(__file__), os.pardir, 'docs', 'data',
+                      'trains.csv')
+
+
+def _chunks(df, size=2):
+    return (df.iloc[i:i + size] for i in range(0, len(df), size))
+
+def test_running_stats_matches_full():
+    df = pd.DataFrame({'A': np.random.randn(101),
+                       'B': np.random.randint(0, 10, 101).astype(float)})
+    df.iloc[3, 1] = np.nan
+    stats = RunningStats()
+    for chunk in _chunks(df, 10):
+        stats.update(chunk)
+    tm.assert_series_equal(stats.mean, df.mean())
+    tm.assert_series_equal(stats.std, df.std())
+    tm.assert_series_equal(stats.min, df.min())
+    tm.assert_series_equal(stats.max, df.max())
+    assert stats.count.tolist() == [101, 100]
+
+def test_validate_csv_chunks():
+    plan = (CheckPlan()
+            .add(ck.none_missing)
+            .add(ck.unique_index)
+            .add(ck.is_shape, (-1, 12))
+            .add(ck.within_range, {'price1': (0, 10000)})
+            .add(ck.within_set, {'choice': ['choice1', 'choice2']}))
+    validator = validate_chunks(pd.read_csv(TRAINS, chunksize=500), plan)
+    assert validator.rows == len(pd.read_csv(TRAINS))
+
+def test_stream_yields_chunks():
+    df = pd.DataFrame({'A': [1, 2, 3, 4, 5]})
+    validator = StreamValidator(CheckPlan().add(ck.none_missing))
+    result = pd.concat(validator.stream(_chunks(df)))
+    tm.assert_frame_equal(result, df)
+
+@pytest.mark.parametrize('values', [
+    [1, 2, 3, 1],
+    [1, 2, np.nan, np.nan],
+    [1, 1, 2, 3],
+])
+def test_unique_across_chunks(values):
+    df = pd.DataFrame({'A': values})
+    with pytest.raises(AssertionError):
+        ck.unique(df)
+    with pytest.raises(AssertionError):
+        validate_chunks(_chunks(df), [ck.unique])
+
+def test_unique_index_across_chunks():
+    df = pd.DataFrame({'A': [1, 2, 3]}, index=['a', 'b', 'a'])
+    with pytest.raises(AssertionError):
+        validate_chunks(_chunks(df), [ck.unique_index])
+    validate_chunks(_chunks(df.reset_index()), [ck.unique_index])
+
+@pytest.mark.parametrize('values, kwargs, good', [
+    ([1, 2, 2, 3], {}, True),
+    ([1, 2, 2, 3], {'strict': True}, False),
+    ([3, 2, 2, 1], {'increasing': False}, True),
+    ([3, 2, 2, 1], {'increasing': True}, False),
+    ([1, 2, 3, 2], {}, False),
+    ([1, 2, 1, 2], {}, False),
+])
+def test_monotonic_across_chunks(values, kwargs, good):
+    df = pd.DataFrame({'A': values})
+    plan = CheckPlan().add(ck.is_monotonic, **kwargs)
+    if good:
+        ck.is_monotonic(df, **kwargs)
+        validate_chunks(_chunks(df), plan)
+    else:
+        with pytest.raises(AssertionError):
+            ck.is_monotonic(df, **kwargs)
+        with pytest.raises(AssertionError):
+            validate_chunks(_chunks(df), plan)
+
+def test_within_n_std_across_chunks():
+    df = pd.DataFrame({'A': np.arange(10), 'B': list('abcde') * 2})
+    validate_chunks(_chunks(df, 3), [ck.within_n_std])
+    plan = CheckPlan().add(ck.within_n_std, .5)
+    with pytest.raises(AssertionError):
+        validate_chunks(_chunks(df, 3), plan)
+
+def test_one_to_many_across_chunks():
+    df = pd.DataFrame({
+        'parameter': ['Cu', 'Cu', 'Pb', 'Pb'],
+        'units': ['ug/L', 'ug/L', 'ug/L', 'mg/L'],
+    })
+    plan = CheckPlan().add(ck.one_to_many, 'units', 'parameter')
+    with pytest.raises(AssertionError):
+        validate_chunks(_chunks(df, 3), plan)
+    validate_chunks(_chunks(df.iloc[:3], 1), plan)
+
+@pytest.mark.parametrize('units', [[np.nan, 1.], [1., np.nan]])
+def test_one_to_many_missing_units(units):
+    df = pd.DataFrame({'parameter': ['Cu', 'Cu'], 'units': units})
+    plan = CheckPlan().add(ck.one_to_many, 'units', 'parameter')
+    with pytest.raises(AssertionError):
+        plan.validate(df)
+    with pytest.raises(AssertionError):
+        validate_chunks(_chunks(df, 1), plan)
+    df = pd.DataFrame({'parameter': ['Cu', 'Cu'], 'units': [np.nan] * 2})
+    validate_chunks(_chunks(df, 1), plan)
+
+def test_shape_across_chunks():
+    df = pd.DataFrame({'A': [1, 2, 3]})
+    validate_chunks(_chunks(df), CheckPlan().add(ck.is_shape, (3, 1)))
+    with pytest.raises(AssertionError):
+        validate_chunks(_chunks(df), CheckPlan().add(ck.is_shape, (2, 1)))
+
+def test_verify_any_across_chunks():
+    df = pd.DataFrame({'A': [1, 2, 3]})
+    f = lambda x, n: x > n
+    validate_chunks(_chunks(df), CheckPlan().add(ck.verify_any, f, 2))
+    with pytest.raises(AssertionError):
+        validate_chunks(_chunks(df), CheckPlan().add(ck.verify_any, f, 3))
+
+def test_unsupported_check():
+    with pytest.raises(ValueError):
+        StreamValidator(CheckPlan().add(ck.is_same_as, pd.DataFrame()))
+
+def test_running_stats_fit_and_store():
+    df = pd.DataFrame({'A': np.linspace(-1, 1, 100), 'B': np.arange(100),
+                       'C': ['x'] * 100})
+    stats = RunningStats.fit(_chunks(df, 7))
+    tm.assert_series_equal(stats.mean, df[['A', 'B']].mean())
+    tm.assert_series_equal(stats.std, df[['A', 'B']].std())
+
+    stored = RunningStats.from_frame(stats.to_frame())
+    tm.assert_series_equal(stored.std, stats.std, check_names=False)
+
+    plan = CheckPlan().add(ck.within_n_std, 1, stats=stored)
+    validate_chunks(_chunks(df[df.B.between(40, 59)], 3), plan)
+    with pytest.raises(AssertionError):
+        validate_chunks(_chunks(df, 3), plan)
+
+def test_validate_appended(tmpdir):
+    path = str(tmpdir.join('state.sqlite'))
+    plan = (CheckPlan()
+            .add(ck.unique, ['id'])
+            .add(ck.unique_index)
+            .add(ck.is_monotonic, {'t': (True, True)})
+            .add(ck.within_n_std, 3)
+            .add(ck.none_missing))
+    df = pd.DataFrame({'id': np.arange(30), 't': np.arange(30.) * 2},
+                      index=np.arange(30) + 100)
+    for chunk in _chunks(df, 10):
+        validator = validate_appended(chunk, plan, path)
+    assert validator.rows == 30
+
+    bad = [df.iloc[[5]],
+           pd.DataFrame({'id': [50], 't': [1.]}, index=[500]),
+           pd.DataFrame({'id': [50], 't': [100.]}, index=[100]),
+           pd.DataFrame({'id': [50], 't': [np.nan]}, index=[500])]
+    for chunk in bad:
+        with pytest.raises(AssertionError):
+            validate_appended(chunk, plan, path)
+    assert StreamValidator.load(plan, path).rows == 30
+
+    good = pd.DataFrame({'id': [30], 't': [60.]}, index=[130])
+    assert validate_appended(good, plan, path).rows == 31
+
+def test_saved_keys(tmpdir):
+    path = str(tmpdir.join('state.sqlite'))
+    plan = (CheckPlan()
+            .add(ck.unique, ['id', 'name'])
+            .add(ck.unique_index)
+            .add(ck.one_to_many, 'unit', 'name'))
+    first = pd.DataFrame({'id': [1, 2], 'name': ['a', 'b'],
+                          'unit': [np.nan, 1.]},
+                         index=pd.to_datetime(['2015', '2016']))
+    validate_appended(first, plan, path)
+    # nothing but the state's summary is loaded
+    validator = StreamValidator.load(plan, path)
+    assert validator.states[0].seen['id'].new == {}
+
+    bad = [{'id': [2.]}, {'name': ['a']}, {'unit': [1.]},
+           {'index': pd.to_datetime(['2016'])}]
+    for change in bad:
+        chunk = pd.DataFrame({'id': [3], 'name': ['c'], 'unit': [0.]},
+                             index=pd.to_datetime(['2017']))
+        for col, values in change.items():
+            if col == 'index':
+                chunk.index = values
+            else:
+                chunk[col] = values
+        if 'unit' in change:
+            chunk['name'] = 'b'
+        with pytest.raises(AssertionError):
+            validate_appended(chunk, plan, path)
+    good = pd.DataFrame({'id': [3.], 'name': ['a'], 'unit': [np.nan]},
+                        index=pd.to_datetime(['2017']))
+    with pytest.raises(AssertionError):
+        validate_appended(good, plan, path)
+    good['name'] = 'c'
+    validator = validate_appended(good, plan, path)
+
+    # saved elsewhere, with the keys saved before
+    other = str(tmpdir.join('other.sqlite'))
+    validator.save(other)
+    for chunk in [first.iloc[:1], good]:
+        with pytest.raises(AssertionError):
+            validate_appended(chunk.set_axis(pd.to_datetime(['2020']),
+                                             axis=0), plan, other)
+    assert StreamValidator.load(plan, other).rows == 3
+
+def test_failed_chunk_rolls_back():
+    plan = (CheckPlan()
+            .add(ck.unique, ['id'])
+            .add(ck.unique_index)
+            .add(ck.one_to_many, 'unit', 'id')
+            .add(ck.is_monotonic, {'t': (True, True)})
+            .add(ck.within_n_std, 3)
+            .add(ck.is_shape, (-1, 3)))
+    df = pd.DataFrame({'id': np.arange(20), 'unit': np.arange(20) % 2,
+                       't': np.arange(20.)})
+    validator = StreamValidator(plan)
+    validator.append(df)
+    saved = [{k: copy.deepcopy(getattr(state, k)) for k in state.saved}
+             for state in validator.states]
+
+    # fails in update, after the first steps accepted the chunk
+    bad = pd.DataFrame({'id': [20, 21], 'unit': [0, 1], 't': [21., 20]},
+                       index=[20, 21])
+    with pytest.raises(AssertionError):
+        validator.update(bad)
+    # fails in finalize, once every step accepted the chunk
+    outlier = pd.DataFrame({'id': [20], 'unit': [0], 't': [1000.]},
+                           index=[20])
+    with pytest.raises(AssertionError):
+        validator.append(outlier)
+
+    assert validator.rows == 20
+    for state, before in zip(validator.states, saved):
+        for k, v in before.items():
+            after = getattr(state, k)
+            if isinstance(v, RunningStats):
+                tm.assert_series_equal(v.mean, after.mean)
+            elif k == 'last':
+                assert list(v) == list(after)
+            else:
+                assert v == after
+    retry = pd.DataFrame({'id': [20, 21], 'unit': [0, 1], 't': [20., 21]},
+                         index=[20, 21])
+    validator.append(retry)
+    assert validator.rows == 22
+
+def test_load_other_plan(tmpdir):
+    path = str(tmpdir.join('state.sqlite'))
+    validator = StreamValidator(CheckPlan().add(ck.unique_index))
+    validator.append(pd.DataFrame({'A': [1]}))
+    validator.save(path)
+    with pytest.raises(ValueError):
+        StreamValidator.load(CheckPlan().add(ck.none_missing), path)
+
+def test_approx_unique():
+    df = pd.DataFrame({'id': np.arange(5000), 'name': ['x'] * 5000,
+                       'f': np.arange(5000.)}, index=np.arange(5000) * 2)
+    df.iloc[4000, 2] = df.iloc[10, 2]
+    chunks = lambda: _chunks(df, 700)
+
+    distinct = approx_unique(chunks, ['id'], index=True,
+                             capacity=10 ** 3, error_rate=.1)
+    assert distinct.index.tolist() == ['id', None]
+    assert 4900 < distinct['id'] < 5100
+
+    with pytest.raises(AssertionError) as e:
+        approx_unique(chunks, ['id', 'f'])
+    assert e.value.args == ("Column 'f' contains non-unique values", [10.])
+    with pytest.raises(AssertionError) as e:
+        approx_unique(chunks)
+    assert e.value.args[0] == "Column 'name' contains non-unique values"
+
+    df.index = np.arange(5000) % 4999
+    with pytest.raises(AssertionError) as e:
+        approx_unique(chunks, index=True)
+    assert e.value.args == (0,)
+
+def test_approx_unique_across_dtypes():
+    chunks = lambda: [pd.DataFrame({'id': [1, 2, 3]}),
+                      pd.DataFrame({'id': [4., 3., np.nan]})]
+    with pytest.raises(AssertionError) as e:
+        approx_unique(chunks, ['id'])
+    assert e.value.args == ("Column 'id' contains non-unique values", [3.])
+    with pytest.raises(AssertionError):
+        validate_chunks(chunks(), [ck.unique])
+
+def test_approx_unique_nulls():
+    df = pd.DataFrame({'A': [1., np.nan, 2., np.nan]})
+    with pytest.raises(AssertionError) as e:
+        approx_unique(lambda: _chunks(df), ['A'])
+    assert np.isnan(e.value.args[1][0])